@@ -20,13 +20,14 @@
 //=============================================================================
 
 module Post_cpu
+   #(parameter ADD_WIDTH=8)   // IP and DP width: 2**ADD_WIDTH nibbles of code, 2**ADD_WIDTH bits of tape
    (
     input wire clk, reset,
     input wire run,
     output wire [3:0] state,
-    output wire [7:0] code_add,
+    output wire [ADD_WIDTH-1:0] code_add,
     input wire [3:0] code,
-    output wire [7:0] data_add,
+    output wire [ADD_WIDTH-1:0] data_add,
     input wire din,
     output wire dout,
     output wire  data_we
@@ -57,13 +58,21 @@ module Post_cpu
       jz_code = 		4'h6,
       stop_code = 		4'h7;
 
+   // jmp/jz targets take JMP_NIBBLES nibbles after the opcode: the high
+   // ones (load_ha_jmp, once per nibble) and then the low one (load_la_jmp)
+   localparam JMP_NIBBLES = (ADD_WIDTH + 3) / 4;
+   localparam HADD_WIDTH = 4 * (JMP_NIBBLES - 1);
+
    // signal declaration
    reg [3:0] state_reg, state_next;
-   reg [7:0] IP_reg, IP_next;
-   reg [7:0] DP_reg, DP_next;
+   reg [ADD_WIDTH-1:0] IP_reg, IP_next;
+   reg [ADD_WIDTH-1:0] DP_reg, DP_next;
    reg [3:0] instruction_reg, instruction_next;
-   reg [3:0] hadd_reg, hadd_next;
+   reg [HADD_WIDTH-1:0] hadd_reg, hadd_next;
    reg [3:0] ladd_reg, ladd_next;
+   reg [1:0] hcnt_reg, hcnt_next;
+   wire [HADD_WIDTH+3:0] hadd_shift = {hadd_reg, code};
+   wire [HADD_WIDTH+3:0] jmp_target = {hadd_reg, ladd_reg};
    reg bit_reg, bit_next;
    reg we_reg, we_next;
    
@@ -79,6 +88,7 @@ module Post_cpu
          	instruction_reg <= 0;
          	hadd_reg <= 0;
          	ladd_reg <= 0;
+         	hcnt_reg <= 0;
          	bit_reg <= 1'b0;
          	we_reg <= 1'b0;
          end
@@ -90,6 +100,7 @@ module Post_cpu
          	instruction_reg <= instruction_next;
          	hadd_reg <= hadd_next;
          	ladd_reg <= ladd_next;
+         	hcnt_reg <= hcnt_next;
          	bit_reg <= bit_next;
          	we_reg <= we_next;
          end
@@ -102,6 +113,7 @@ module Post_cpu
       instruction_next = instruction_reg;
       hadd_next = hadd_reg;
       ladd_next = ladd_reg;
+      hcnt_next = hcnt_reg;
 
       case (state_reg)
          stop :
@@ -145,8 +157,17 @@ module Post_cpu
          load_ha_jmp : 
           begin	
             IP_next = IP_reg + 1;
-            hadd_next = code;
-            state_next = load_la_jmp;
+            hadd_next = hadd_shift[HADD_WIDTH-1:0];
+            if (JMP_NIBBLES == 2 || hcnt_reg == JMP_NIBBLES - 2)
+             begin
+               hcnt_next = 0;
+               state_next = load_la_jmp;
+             end
+            else
+             begin
+               hcnt_next = hcnt_reg + 1;
+               state_next = load_ha_jmp;
+             end
           end	
 
          load_la_jmp :
@@ -157,7 +178,7 @@ module Post_cpu
 
          jmp_exe :
           begin	
-            IP_next = {hadd_reg,  ladd_reg};
+            IP_next = jmp_target[ADD_WIDTH-1:0];
             state_next = fetch_decode;
           end	
 
@@ -166,7 +187,7 @@ module Post_cpu
                state_next = load_ha_jmp;
             else
              begin
-               IP_next = IP_reg + 2;
+               IP_next = IP_reg + JMP_NIBBLES;
                state_next = fetch_decode;
              end
          incdp_exe :
@@ -21,6 +21,7 @@
 
 
 module Post_sys_4Tiny
+#(parameter ADD_WIDTH=8)   // code and tape address width (OUT8B shows the low 8 bits)
 (
     input CLK,NRST,RUN,MODE,
     input [2:0] OUT_CTRL,
@@ -48,9 +49,9 @@ module Post_sys_4Tiny
     wire cpu2ram_din;
     wire mxd_ram_din;
 
-    wire [7:0] spi2ram_add;
-    wire [7:0] cpu2ram_add;
-    wire [7:0] mxd_ram_add;
+    wire [ADD_WIDTH-1:0] spi2ram_add;
+    wire [ADD_WIDTH-1:0] cpu2ram_add;
+    wire [ADD_WIDTH-1:0] mxd_ram_add;
     
     wire spi2ram_we;
     wire cpu2ram_we;
@@ -62,22 +63,22 @@ module Post_sys_4Tiny
     wire [3:0] spi2rom_din;
     wire [3:0] mxd_rom_din;
 
-    wire [7:0] spi2rom_add;
-    wire [7:0] cpu2rom_add;
-    wire [7:0] mxd_rom_add;
+    wire [ADD_WIDTH-1:0] spi2rom_add;
+    wire [ADD_WIDTH-1:0] cpu2rom_add;
+    wire [ADD_WIDTH-1:0] mxd_rom_add;
 
     wire spi2rom_we;
     wire mxd_rom_we;
   
     //instantiations:
-    sync_ram #(.DATA_WIDTH(1), .ADD_WIDTH(8)) my_ram
+    sync_ram #(.DATA_WIDTH(1), .ADD_WIDTH(ADD_WIDTH)) my_ram
     (.clk(mxd_mem_clk), .we(mxd_ram_we), .datain(mxd_ram_din), .address(mxd_ram_add), .dataout(cpu2ram_dout));
 
-    sync_ram #(.DATA_WIDTH(4), .ADD_WIDTH(8)) my_rom
+    sync_ram #(.DATA_WIDTH(4), .ADD_WIDTH(ADD_WIDTH)) my_rom
     (.clk(mxd_mem_clk), .we(mxd_rom_we), .datain(mxd_rom_din), .address(mxd_rom_add), .dataout(cpu2rom_dout));
 
 
-    slave_spi4post my_PostSPI
+    slave_spi4post #(.ADD_WIDTH(ADD_WIDTH)) my_PostSPI
     (
     .CLK(CLK), .RST(loc_rst),
     .CS(SPI_CS), .MOSI(SPI_MOSI), .SCK(SPI_SCK),
@@ -92,7 +93,7 @@ module Post_sys_4Tiny
     .dwe_prg(spi2ram_we), .prog_clk(prog_clk)
     );    
 
-   Post_cpu my_cpu
+   Post_cpu #(.ADD_WIDTH(ADD_WIDTH)) my_cpu
    (
     .clk(CLK), .reset(loc_rst),
     .run(run_sig),
@@ -124,9 +125,9 @@ module Post_sys_4Tiny
     assign mxd_mem_clk = (MODE) ? mem_clk :  prog_clk;
   
    //8 to 1 multiplexor for OUT8B:
-     assign OUT8B = (OUT_CTRL[2] ? (OUT_CTRL[1] ? (OUT_CTRL[0] ? cpu2ram_add : cpu2ram_add) : (OUT_CTRL[0] ? cpu2rom_add : cpu2rom_add)) 
+     assign OUT8B = (OUT_CTRL[2] ? (OUT_CTRL[1] ? (OUT_CTRL[0] ? cpu2ram_add[7:0] : cpu2ram_add[7:0]) : (OUT_CTRL[0] ? cpu2rom_add[7:0] : cpu2rom_add[7:0])) 
                               :
-                             (OUT_CTRL[1] ? (OUT_CTRL[0] ? spi2ram_add : spi2ram_add) : (OUT_CTRL[0] ? spi2rom_add : spi2rom_add)));
+                             (OUT_CTRL[1] ? (OUT_CTRL[0] ? spi2ram_add[7:0] : spi2ram_add[7:0]) : (OUT_CTRL[0] ? spi2rom_add[7:0] : spi2rom_add[7:0])));
 
    //8 to 1 multiplexor for OUT3B:
      assign OUT3B = (OUT_CTRL[2] ? (OUT_CTRL[1] ? (OUT_CTRL[0] ? {2'b00, cpu2ram_dout} : {2'b00, cpu2ram_din}) : (OUT_CTRL[0] ? cpu2rom_dout[2:0] : cpu2rom_dout[2:0])) 
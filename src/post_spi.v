@@ -19,17 +19,18 @@
 //=============================================================================
 
 module slave_spi4post
+   #(parameter ADD_WIDTH=8)
    (
     input wire CLK, RST,
     input wire CS, MOSI, SCK,
     output wire MISO,
     input wire [3:0] cin_prg,
     output wire [3:0] cout_prg,
-    output wire [7:0] cadd_prg,
+    output wire [ADD_WIDTH-1:0] cadd_prg,
     output wire  cwe_prg,
     input wire din_prg,
     output wire dout_prg,
-    output wire [7:0] dadd_prg,
+    output wire [ADD_WIDTH-1:0] dadd_prg,
     output wire  dwe_prg, prog_clk
    );
 
@@ -57,15 +58,21 @@ module slave_spi4post
       wait_low_o     = 5'b10011, 
       wait_high_o    = 5'b10100;
 
+   // SPI words are 16 bits up to ADD_WIDTH=10:
+   //    {RW, RAM, unused[9-ADD_WIDTH:0], address[ADD_WIDTH-1:0], data[3:0]}
+   // (none at ADD_WIDTH=10), and ADD_WIDTH+6 bits for wider addresses:
+   //    {RW, RAM, address[ADD_WIDTH-1:0], data[3:0]}
+   localparam WORD_WIDTH = (ADD_WIDTH > 10) ? ADD_WIDTH + 6 : 16;
+
    // signal declaration
    reg [4:0] state_reg, state_next;
-   reg [15:0] SRi_reg, SRi_next;
-   reg [15:0] SRo_reg, SRo_next;
+   reg [WORD_WIDTH-1:0] SRi_reg, SRi_next;
+   reg [WORD_WIDTH-1:0] SRo_reg, SRo_next;
    reg [5:0] Cnt_reg, Cnt_next;
    reg MISO_buf_reg,MISO_buf_next;
-   reg [7:0] cadd_buf_reg, cadd_buf_next;
+   reg [ADD_WIDTH-1:0] cadd_buf_reg, cadd_buf_next;
    reg [3:0] cout_buf_reg, cout_buf_next;
-   reg [7:0] dadd_buf_reg, dadd_buf_next;
+   reg [ADD_WIDTH-1:0] dadd_buf_reg, dadd_buf_next;
    reg dout_buf_reg, dout_buf_next;
    reg cwe_buf_reg, cwe_buf_next;
    reg dwe_buf_reg, dwe_buf_next;
@@ -135,8 +142,8 @@ module slave_spi4post
             if (~CS)
                if (~SCK)
                   begin
-                  	MISO_buf_next = SRo_reg[15]; 
-                  	SRo_next = {SRo_reg[14 : 0] , 1'b0};
+                  	MISO_buf_next = SRo_reg[WORD_WIDTH-1]; 
+                  	SRo_next = {SRo_reg[WORD_WIDTH-2 : 0] , 1'b0};
                   	state_next = wait_high_i;
                   end                  
                else
@@ -152,9 +159,9 @@ module slave_spi4post
             if (~CS)
                if (SCK)
                 begin
-                  SRi_next = {SRi_reg[14 : 0],  MOSI};
+                  SRi_next = {SRi_reg[WORD_WIDTH-2 : 0],  MOSI};
                   
-                  if (Cnt_reg == 15)
+                  if (Cnt_reg == WORD_WIDTH-1)
                      state_next = doit;
                   else
                     begin
@@ -172,28 +179,28 @@ module slave_spi4post
 
          doit :
           begin	
-            if (SRi_reg[15])
-               if (SRi_reg[14]) 
+            if (SRi_reg[WORD_WIDTH-1])
+               if (SRi_reg[WORD_WIDTH-2]) 
                 begin
-                  dadd_buf_next = SRi_reg[11 : 4];
+                  dadd_buf_next = SRi_reg[ADD_WIDTH+3 : 4];
                   state_next = ini_read_ram;
                 end
                else
                 begin
-                  cadd_buf_next = SRi_reg[11 : 4];
+                  cadd_buf_next = SRi_reg[ADD_WIDTH+3 : 4];
                   state_next = ini_read_rom;
                 end
             else
              begin
-               if (SRi_reg[14]) 
+               if (SRi_reg[WORD_WIDTH-2]) 
                 begin
-                  dadd_buf_next = SRi_reg[11 : 4];
+                  dadd_buf_next = SRi_reg[ADD_WIDTH+3 : 4];
                   dout_buf_next =  SRi_reg[0];
                   state_next = ini_write_ram;
                 end
                else
                 begin
-                  cadd_buf_next = SRi_reg[11 : 4];
+                  cadd_buf_next = SRi_reg[ADD_WIDTH+3 : 4];
                   cout_buf_next =  SRi_reg[3 : 0];
                   state_next = ini_write_rom;
                 end
@@ -209,7 +216,7 @@ module slave_spi4post
             
          read_rom :
           begin	         
-            SRo_next = {SRi_reg[15 : 4],  cin_prg};
+            SRo_next = {SRi_reg[WORD_WIDTH-1 : 4],  cin_prg};
             state_next = end2;
           end
            
@@ -221,7 +228,7 @@ module slave_spi4post
             
          read_ram :
           begin	         
-            SRo_next = {SRi_reg[15 : 4], 3'b000, din_prg};
+            SRo_next = {SRi_reg[WORD_WIDTH-1 : 4], 3'b000, din_prg};
             state_next = end2;
           end
            
@@ -275,8 +282,8 @@ module slave_spi4post
             if (~CS)
                if (~SCK)
                 begin
-                    MISO_buf_next = SRo_reg[15]; 
-                    SRo_next = {SRo_reg[14 : 0], 1'b0};
+                    MISO_buf_next = SRo_reg[WORD_WIDTH-1]; 
+                    SRo_next = {SRo_reg[WORD_WIDTH-2 : 0], 1'b0};
                     state_next = wait_high_o;
 		        end               
                else
@@ -288,7 +295,7 @@ module slave_spi4post
          wait_high_o :
             if (~CS)
                if (SCK)                  
-                  if (Cnt_reg == 15)
+                  if (Cnt_reg == WORD_WIDTH-1)
                      state_next = end1;
                   else
                    begin
@@ -29,7 +29,12 @@ module tt_um_galaguna_PostSys (
     wire [2:0] out3b;
     
     //instantiations:
-    Post_sys_4Tiny my_PostSys
+    // POST_ADD_WIDTH widens the code and tape spaces for simulation studies
+    // (test/Makefile ADD_WIDTH=...); the Tiny Tapeout build uses 8.
+`ifndef POST_ADD_WIDTH
+`define POST_ADD_WIDTH 8
+`endif
+    Post_sys_4Tiny #(.ADD_WIDTH(`POST_ADD_WIDTH)) my_PostSys
     (
     .CLK(loc_clk), .NRST(loc_NRst),
     .RUN(exec), .MODE(mode), .OUT_CTRL(out_ctrl),
@@ -0,0 +1,103 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Backdoor access to the my_rom/my_ram sync_ram arrays of Post_sys_4Tiny.
+
+Each image is written or read with one assignment to the ``ram`` array
+handle instead of 16 SCK periods per location through slave_spi4post.
+The SPI front door is still used to check a random sample of locations
+when ``verify`` is requested, and as a fallback when the hierarchy is
+not available (gate level netlist).
+"""
+
+import random
+
+from spi_master import RAM_BASE, RAM_SIZE, ROM_BASE, ROM_SIZE, STUFF_WORD, command_word
+
+
+def _cells(handle):
+    # sync_ram declares ram[(2**ADD_WIDTH)-1:0] and cocotb maps list
+    # index 0 to the left-most (highest) address, hence the reversals.
+    return [int(v) if v.is_resolvable else 0 for v in reversed(handle.value)]
+
+
+def _pad(values, size, limit):
+    values = list(values)
+    if len(values) > size:
+        raise ValueError(f"image of {len(values)} cells does not fit {size} locations")
+    for v in values:
+        if not 0 <= v <= limit:
+            raise ValueError(f"cell value 0x{v:X} out of range")
+    return values + [0] * (size - len(values))
+
+
+class BackdoorLoader:
+    """Bulk ROM/RAM loader for ``tb`` (see tb.v); ``spi`` is a PostSpiMaster."""
+
+    def __init__(self, dut, spi=None):
+        self.dut = dut
+        self.spi = spi
+        try:
+            post_sys = dut.user_project.my_PostSys
+            self._rom = post_sys.my_rom.ram
+            self._ram = post_sys.my_ram.ram
+        except AttributeError:
+            self._rom = self._ram = None
+        # 256 locations each, 2**ADD_WIDTH in a wider build
+        self.rom_size = len(self._rom) if self._rom is not None else ROM_SIZE
+        self.ram_size = len(self._ram) if self._ram is not None else RAM_SIZE
+
+    @property
+    def available(self):
+        return self._rom is not None
+
+    def write_rom(self, nibbles):
+        self._rom.setimmediatevalue(list(reversed(_pad(nibbles, self.rom_size, 0xF))))
+
+    def write_ram(self, bits):
+        self._ram.setimmediatevalue(list(reversed(_pad(bits, self.ram_size, 0x1))))
+
+    def read_rom(self):
+        """Return the code space as a 256 nibble ``bytearray`` (X reads as 0)."""
+        return bytearray(_cells(self._rom))
+
+    def read_ram(self):
+        """Return the data space as a 256 bit ``bytearray`` (X reads as 0)."""
+        return bytearray(_cells(self._ram))
+
+    async def load(self, rom=None, ram=None, verify=0, seed=None):
+        """Load ROM and/or RAM images (MODE=0 when SPI is involved).
+
+        ``verify`` locations of each image are read back through SPI. Without
+        the backdoor the whole image goes through SPI instead.
+        """
+        if not self.available:
+            if self.spi is None:
+                raise RuntimeError("memory arrays not reachable and no SPI master given")
+            await self.spi.load_images(None if rom is None else _pad(rom, ROM_SIZE, 0xF),
+                                       None if ram is None else _pad(ram, RAM_SIZE, 0x1))
+            return
+
+        if rom is not None:
+            self.write_rom(rom)
+        if ram is not None:
+            self.write_ram(ram)
+        if verify:
+            await self.verify(verify, seed)
+
+    async def verify(self, samples, seed=None):
+        """Compare ``samples`` random locations of each memory with SPI reads."""
+        if self.spi is None:
+            raise RuntimeError("front door verification needs an SPI master")
+        rng = random.Random(seed)
+        for base, size, image in ((ROM_BASE, ROM_SIZE, self.read_rom()),
+                                  (RAM_BASE, RAM_SIZE, self.read_ram())):
+            locs = sorted(rng.sample(range(size), min(samples, size)))
+            words = []
+            for loc in locs:
+                words += [command_word(base + loc, read=True), STUFF_WORD]
+            replies = await self.spi.transfer_many(words)
+            for loc, reply in zip(locs, replies[1::2]):
+                got = reply & 0xF
+                assert got == image[loc], \
+                    f"SPI read of 0x{base + loc:03X} gave 0x{got:X}, backdoor holds 0x{image[loc]:X}"
@@ -0,0 +1,109 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""NumPy batch executor: N Post_cpu machines stepped in lock-step.
+
+Every machine holds a row of an N x 256 uint8 ROM and an N x 256 bool
+tape. ``step()`` retires one instruction on every running machine with
+masked updates and adds the cycles that instruction spends in the
+Post_cpu FSM, so ``cycles`` agrees with post_model.PostCpuModel.run().
+"""
+
+from itertools import product
+
+import numpy as np
+
+from post_model import (CODE_SIZE, CYCLES_EXE, CYCLES_JMP, CYCLES_JZ_SKIP, CYCLES_JZ_TAKEN, CYCLES_NOP,
+                        CYCLES_START, CYCLES_STOP, CLR, DECDP, FETCH_DECODE, INCDP, JMP, JZ, SET, STOP,
+                        TAPE_SIZE)
+
+# Cycles per opcode; jz is charged CYCLES_JZ_SKIP here and the extra
+# cycles of a taken jump are added separately.
+_CYCLES = np.array([CYCLES_NOP] + [CYCLES_EXE] * 4 + [CYCLES_JMP, CYCLES_JZ_SKIP] + [CYCLES_STOP] * 9,
+                   dtype=np.int64)
+
+
+class PostBatch:
+    """Lock-step executor for N programs (``roms``) and starting tapes."""
+
+    def __init__(self, roms, tapes=None):
+        roms = np.atleast_2d(np.asarray(roms, dtype=np.uint8))
+        if roms.shape[1] > CODE_SIZE or roms.max(initial=0) > 0xF:
+            raise ValueError("programs must be at most 256 nibbles")
+        n = roms.shape[0]
+        self.rom = np.zeros((n, CODE_SIZE), dtype=np.uint8)
+        self.rom[:, :roms.shape[1]] = roms
+
+        self.tape = np.zeros((n, TAPE_SIZE), dtype=bool)
+        if tapes is not None:
+            tapes = np.atleast_2d(np.asarray(tapes, dtype=bool))
+            self.tape[:, :tapes.shape[1]] = tapes
+
+        # state after the start cycle: IP = DP = 0, fetch_decode
+        self.ip = np.zeros(n, dtype=np.uint8)
+        self.dp = np.zeros(n, dtype=np.uint8)
+        self.state = np.full(n, FETCH_DECODE, dtype=np.uint8)
+        self.cycles = np.full(n, CYCLES_START, dtype=np.int64)
+        self._active = np.arange(n)
+
+    def __len__(self):
+        return self.rom.shape[0]
+
+    @property
+    def halted(self):
+        return self.state == STOP
+
+    def step(self):
+        """Retire one instruction on each running machine; return how many still run."""
+        a = self._active
+        if not len(a):
+            return 0
+        ip, dp = self.ip[a], self.dp[a]
+        code = self.rom[a, ip]
+        ip1 = ip + np.uint8(1)
+        cell = self.tape[a, dp]
+
+        taken = (code == JZ) & ~cell
+        jump = (code == JMP) | taken
+        target = (self.rom[a, ip1] << np.uint8(4)) | self.rom[a, ip1 + np.uint8(1)]
+        self.ip[a] = np.where(jump, target, np.where(code == JZ, ip1 + np.uint8(2), ip1))
+        self.dp[a] = dp + (code == INCDP).astype(np.uint8) - (code == DECDP).astype(np.uint8)
+
+        write = (code == SET) | (code == CLR)
+        self.tape[a[write], dp[write]] = code[write] == SET
+
+        self.cycles[a] += _CYCLES[code] + taken * (CYCLES_JZ_TAKEN - CYCLES_JZ_SKIP)
+        stopped = code > JZ
+        self.state[a[stopped]] = STOP
+        self._active = a[~stopped]
+        return len(self._active)
+
+    def run(self, max_cycles=1 << 16):
+        """Step until every machine stops or has spent ``max_cycles``."""
+        while len(self._active):
+            self.step()
+            self._active = self._active[self.cycles[self._active] < max_cycles]
+        return self
+
+    def stats(self):
+        """Halting and cycle-count statistics of the batch."""
+        halted = self.halted
+        cycles = self.cycles[halted]
+        return {
+            "machines": len(self),
+            "halted": int(halted.sum()),
+            "running": int((~halted).sum()),
+            "min_cycles": int(cycles.min()) if len(cycles) else None,
+            "max_cycles": int(cycles.max()) if len(cycles) else None,
+            "mean_cycles": float(cycles.mean()) if len(cycles) else None,
+        }
+
+
+def all_programs(length, opcodes=range(16)):
+    """Every program of ``length`` nibbles over ``opcodes`` as a uint8 array."""
+    return np.array(list(product(opcodes, repeat=length)), dtype=np.uint8).reshape(-1, length)
+
+
+def all_tapes(cells):
+    """Every pattern of the first ``cells`` tape cells as a bool array."""
+    return np.array(list(product((False, True), repeat=cells)), dtype=bool).reshape(-1, cells)
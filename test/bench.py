@@ -0,0 +1,174 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Baseline handling for the benchmark suite (``test_benchmarks``).
+
+The programs are ``benchmarks/*.epm``. ``benchmarks/baseline.json``
+keeps the simulated cycles of every program (program run and SPI load)
+per level (``rtl``/``gl``: the gate level load writes whole memories),
+since they do not depend on the simulator, and per simulator the
+throughput of the suite in simulated kcycles per wall clock second::
+
+    {"tolerance": {"cycles": 0.0, "throughput": 0.5},
+     "cycles": {"rtl": {"tape_sweep": {"run": 5903, "load": 2741}, ...}},
+     "throughput": {"icarus/rtl": {"run_kcycles_per_s": ..., "load_kcycles_per_s": ...},
+                    "verilator/rtl": {...}}}
+
+A cycle count regresses when it grows by more than ``tolerance.cycles``
+(relative), a throughput when it drops by more than ``tolerance.throughput``;
+a level or simulator without a baseline entry is not checked. Cycle
+counts are checked by every run of the test; throughput depends on the
+machine and its load, so only ``make bench`` and ``make bench-compare``
+check it (``BENCH_THROUGHPUT=1``). ``make bench-update`` records both.
+
+``compare_simulators`` puts the throughput next to the other simulators'
+(Verilator against Icarus), taken from the results file of the same
+machine when there is one (``make bench-compare`` runs both into
+bench_results.json) and from the baseline otherwise.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent / "benchmarks"
+BASELINE = BENCH_DIR / "baseline.json"
+
+DEFAULT_TOLERANCE = {"cycles": 0.0, "throughput": 0.5}
+
+
+def benchmark_files():
+    return sorted(BENCH_DIR.glob("*.epm"))
+
+
+def load_baseline(path=BASELINE):
+    try:
+        with open(path) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+    baseline.setdefault("tolerance", dict(DEFAULT_TOLERANCE))
+    baseline.setdefault("cycles", {})
+    baseline.setdefault("throughput", {})
+    return baseline
+
+
+def suite_throughput(results):
+    """Simulated kcycles per wall clock second over the whole suite."""
+    run_cycles = sum(r["cycles"] for r in results.values())
+    run_wall = sum(r["run_wall_s"] for r in results.values())
+    load_cycles = sum(r["load_cycles"] for r in results.values())
+    load_wall = sum(r["load_wall_s"] for r in results.values())
+    return {
+        "run_kcycles_per_s": run_cycles / run_wall / 1000 if run_wall else None,
+        "load_kcycles_per_s": load_cycles / load_wall / 1000 if load_wall else None,
+    }
+
+
+def compare(results, baseline, sim_key, throughput=False):
+    """Return ``(regressions, notes)``: lists of messages against the ``sim_key`` baseline.
+
+    The suite throughput is only compared when ``throughput`` is true.
+    """
+    tolerance = baseline["tolerance"]
+    regressions, notes = [], []
+    level = sim_key.split("/")[1]
+    cycles = baseline["cycles"].get(level)
+    if cycles is None:
+        notes.append(f"no cycle baseline for {level}")
+        cycles = {}
+    for name, result in results.items():
+        base = cycles.get(name)
+        if base is None:
+            if cycles:
+                notes.append(f"{name}: not in the baseline")
+            continue
+        for kind, measured in (("run", result["cycles"]), ("load", result["load_cycles"])):
+            if measured > base[kind] * (1 + tolerance["cycles"]):
+                regressions.append(f"{name}: {kind} takes {measured} cycles, baseline {base[kind]}")
+            elif measured < base[kind]:
+                notes.append(f"{name}: {kind} takes {measured} cycles, baseline {base[kind]} (improved)")
+
+    if not throughput:
+        return regressions, notes
+    base = baseline["throughput"].get(sim_key)
+    if base is None:
+        notes.append(f"no throughput baseline for {sim_key}")
+        return regressions, notes
+    for key, measured in suite_throughput(results).items():
+        if measured is None or key not in base:
+            continue
+        if measured < base[key] * (1 - tolerance["throughput"]):
+            regressions.append(f"{sim_key}: {key} {measured:.1f}, baseline {base[key]:.1f}")
+        else:
+            notes.append(f"{sim_key}: {key} {measured:.1f}, baseline {base[key]:.1f}")
+    return regressions, notes
+
+
+def update_baseline(results, baseline, sim_key, path=BASELINE):
+    """Record ``results`` as the new cycle baseline of its level and throughput of ``sim_key``."""
+    baseline["cycles"][sim_key.split("/")[1]] = {name: {"run": r["cycles"], "load": r["load_cycles"]}
+                                                 for name, r in sorted(results.items())}
+    baseline["throughput"][sim_key] = {k: round(v, 1) for k, v in suite_throughput(results).items()
+                                       if v is not None}
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def merge_results(path, results, sim_key):
+    """Add the ``results`` of ``sim_key`` to the results file ``path``; return all of it."""
+    path = Path(path)
+    merged = json.loads(path.read_text()) if path.exists() else {}
+    merged[sim_key] = results
+    path.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n")
+    return merged
+
+
+def compare_simulators(results, sim_key, others):
+    """Notes on the throughput of ``results`` relative to ``others`` {sim key: throughput}."""
+    mine = suite_throughput(results)
+    level = sim_key.split("/")[1]
+    notes = []
+    for other, theirs in sorted(others.items()):
+        if other == sim_key or not other.endswith("/" + level):
+            continue
+        parts = []
+        for key in ("run_kcycles_per_s", "load_kcycles_per_s"):
+            if mine.get(key) and theirs.get(key):
+                parts.append(f"{key.split('_')[0]} {mine[key]:.1f} vs {theirs[key]:.1f} kcycles/s "
+                             f"({mine[key] / theirs[key]:.2f}x)")
+        if parts:
+            notes.append(f"{sim_key} vs {other}: " + ", ".join(parts))
+    if not notes:
+        notes.append(f"no other {level} simulator to compare {sim_key} with (make bench-compare)")
+    return notes
+
+
+def throughput_table(merged):
+    """Text table of the suite throughput of every simulator in a results file."""
+    rows = [("simulator", "run kcycles/s", "load kcycles/s", "speedup")]
+    through = {key: suite_throughput(results) for key, results in sorted(merged.items())}
+    slowest = {}
+    for key, t in through.items():
+        level = key.split("/")[1]
+        if t["run_kcycles_per_s"]:
+            slowest[level] = min(slowest.get(level, t["run_kcycles_per_s"]), t["run_kcycles_per_s"])
+    for key, t in through.items():
+        run, load = t["run_kcycles_per_s"], t["load_kcycles_per_s"]
+        speedup = f"{run / slowest[key.split('/')[1]]:.2f}x" if run else "-"
+        rows.append((key, f"{run:.1f}" if run else "-", f"{load:.1f}" if load else "-", speedup))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip() for row in rows)
+
+
+def main(argv=None):
+    """Print the throughput table of a results file (``BENCH_RESULTS``)."""
+    argv = sys.argv[1:] if argv is None else argv
+    path = Path(argv[0] if argv else "bench_results.json")
+    print(throughput_table(json.loads(path.read_text())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
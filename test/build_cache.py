@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Content-addressed build directories for the Verilator backend.
+
+cocotb rebuilds the Verilator model whenever a source file is newer than
+``$(SIM_BUILD)/Vtop.mk``, so a checkout, a copy or a ``touch`` of
+unchanged RTL costs a full C++ build. With ``SIM=verilator`` the Makefile
+instead names the build directory after a hash of what goes into the
+model: the contents of the sources, the compile arguments (parameters,
+defines, warnings, trace options), the top level and the Verilator and
+cocotb versions::
+
+    sim_build/rtl-<key>/Vtop
+
+``reuse`` dates the outputs of an existing directory after their
+prerequisites, so make only builds when the key is new. Directories of
+old keys are left behind; ``rm -rf sim_build`` drops them.
+
+    build_cache.py key --args "$(COMPILE_ARGS)" $(VERILOG_SOURCES)
+    build_cache.py reuse sim_build/rtl-<key> $(VERILOG_SOURCES) .../verilator.cpp
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+KEY_LENGTH = 16
+
+# Written by the Vtop.mk rule, then by the Vtop rule (Makefile.verilator)
+OUTPUTS = ("Vtop.mk", "Vtop")
+
+
+def build_key(sources, args=""):
+    """Hash of the contents of ``sources`` and of the ``args`` string."""
+    digest = hashlib.sha256()
+    digest.update(" ".join(args.split()).encode())
+    for source in sources:
+        path = Path(source)
+        digest.update(b"\0" + path.name.encode() + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:KEY_LENGTH]
+
+
+def reuse(build_dir, sources=()):
+    """Date the outputs in ``build_dir`` no older than ``sources``; False if it was never built.
+
+    All outputs get the same time, the newest of theirs and of the sources,
+    so that make sees them up to date and concurrent runs (the shards of
+    run_shards.py) agree on it.
+    """
+    build_dir = Path(build_dir)
+    paths = [build_dir / name for name in OUTPUTS]
+    if not all(p.exists() for p in paths):
+        return False
+    newest = max(os.stat(p).st_mtime_ns for p in [*paths, *sources])
+    for path in paths:
+        os.utime(path, ns=(newest, newest))
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    key = sub.add_parser("key", help="print the build key of the sources and arguments")
+    key.add_argument("--args", default="", help="compile arguments, versions, top level")
+    key.add_argument("sources", nargs="*")
+    hit = sub.add_parser("reuse", help="mark an existing build directory as up to date")
+    hit.add_argument("build_dir")
+    hit.add_argument("sources", nargs="*", help="the prerequisites of the outputs")
+    args = parser.parse_args(argv)
+
+    if args.command == "key":
+        print(build_key(args.sources, args.args))
+    else:
+        reuse(args.build_dir, args.sources)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
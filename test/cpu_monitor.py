@@ -0,0 +1,129 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Event driven monitor of the Post_cpu STATE bits (uio_out[3:0]).
+
+The monitor coroutine only wakes up when the state changes: it waits on
+value changes of ``my_cpu.state_reg`` (or of ``uio_out`` when the RTL
+hierarchy is not available, e.g. gate level) instead of sampling every
+clock edge. Cycles spent in each state are derived from the simulation
+time between transitions.
+"""
+
+from collections import Counter
+
+import cocotb
+from cocotb.result import SimTimeoutError
+from cocotb.triggers import Edge, Event, with_timeout
+from cocotb.utils import get_sim_steps, get_sim_time
+
+from pinout import MSK_STATE
+from post_model import STATE_NAMES, STOP
+
+
+class CpuMonitor:
+    """Track the Post_cpu state of ``tb`` (see tb.v).
+
+    ``clk_period``/``units`` must match the cocotb Clock driving ``dut.clk``.
+    """
+
+    def __init__(self, dut, clk_period=10, units="us"):
+        self.dut = dut
+        self.clk_period = clk_period
+        self.units = units
+        self._period_steps = get_sim_steps(clk_period, units)
+        try:
+            self._signal = dut.user_project.my_PostSys.my_cpu.state_reg
+            self._mask = None
+        except AttributeError:
+            self._signal = dut.uio_out
+            self._mask = MSK_STATE
+        self._waiters = {}
+        self._task = None
+        self.reset_counts()
+
+    def reset_counts(self):
+        """Clear the per-state cycle, visit and transition counters."""
+        self.cycles = [0] * 16
+        self.visits = [0] * 16
+        self.halts = 0
+        self.transitions = Counter()
+        self._since = get_sim_time()
+
+    def _read(self):
+        value = self._signal.value
+        if not value.is_resolvable:
+            return None
+        return int(value) & self._mask if self._mask else int(value)
+
+    def start(self):
+        self.state = self._read()
+        self._since = get_sim_time()
+        self._task = cocotb.start_soon(self._watch())
+        return self
+
+    def stop(self):
+        if self._task is not None:
+            self._task.kill()
+            self._task = None
+
+    async def _watch(self):
+        change = Edge(self._signal)
+        while True:
+            await change
+            state = self._read()
+            if state == self.state:
+                continue
+            now = get_sim_time()
+            if self.state is not None:
+                self.cycles[self.state] += round((now - self._since) / self._period_steps)
+            self._since = now
+            if state is not None:
+                self.visits[state] += 1
+                if self.state is not None:
+                    self.transitions[self.state, state] += 1
+                if state == STOP and self.state is not None:
+                    self.halts += 1
+            self.state = state
+            for event in self._waiters.pop(state, ()):
+                event.set()
+
+    def cycles_in(self, state):
+        """Cycles spent in ``state``, including the current visit."""
+        cycles = self.cycles[state]
+        if state == self.state:
+            cycles += round((get_sim_time() - self._since) / self._period_steps)
+        return cycles
+
+    @property
+    def run_cycles(self):
+        """Cycles spent outside ``stop`` since the counters were reset."""
+        return sum(self.cycles_in(s) for s in range(16) if s != STOP)
+
+    def stats(self):
+        return {name: self.cycles_in(s) for s, name in enumerate(STATE_NAMES)}
+
+    async def _wait_entry(self, state, timeout_cycles):
+        event = Event()
+        self._waiters.setdefault(state, []).append(event)
+        if timeout_cycles is None:
+            await event.wait()
+            return
+        try:
+            await with_timeout(event.wait(), timeout_cycles * self.clk_period, self.units)
+        except SimTimeoutError:
+            waiters = self._waiters.get(state, [])
+            if event in waiters:
+                waiters.remove(event)
+            raise SimTimeoutError(
+                f"Post_cpu did not reach state {STATE_NAMES[state]} within {timeout_cycles} cycles "
+                f"(current state: {self.state})") from None
+
+    async def wait_state(self, state, timeout_cycles=None):
+        """Return once STATE equals ``state`` (at once if it already does)."""
+        if self.state != state:
+            await self._wait_entry(state, timeout_cycles)
+
+    async def wait_halt(self, timeout_cycles=None):
+        """Return on the next transition into ``stop``."""
+        await self._wait_entry(STOP, timeout_cycles)
@@ -0,0 +1,254 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Per-instruction performance counters for Post_cpu runs.
+
+``CpuProfiler`` wakes up only on changes of ``my_cpu.state_reg`` and
+reads ``IP_reg``, ``DP_reg`` and ``instruction_reg`` at each transition.
+That is enough to attribute every cycle to an instruction: a visit of
+k cycles to fetch_decode is k - 1 nops followed by the fetch of the
+instruction named by the next state, whose execute states follow until
+fetch_decode is entered again.
+
+The transitions go to any number of sinks with a ``transition`` method:
+``CpuWatcher`` feeds them from the RTL and ``run_model`` from the
+cycle accurate model, so a ``Profile`` and a ``cpu_trace.Trace`` can be
+collected in one pass. ``Profile`` holds the counters; fed from the
+model (``profile_program``) it gives the expected profile of a program,
+or compares two versions of it without a simulator::
+
+    python cpu_profiler.py programs/unary_increment.epm
+"""
+
+import json
+import sys
+
+import cocotb
+from cocotb.triggers import Edge, ReadOnly
+from cocotb.utils import get_sim_steps, get_sim_time
+
+from post_model import (ADD_WIDTH, FETCH_DECODE, JZ_EXE, LOAD_HA_JMP, OPCODE_NAMES, START, STATE_NAMES,
+                        STOP, PostCpuModel)
+
+
+def _opcode_name(code):
+    return OPCODE_NAMES[code] if code < len(OPCODE_NAMES) else "stop"
+
+
+class Profile:
+    """Cycle counters of one run, fed with state transitions (``transition``)."""
+
+    def __init__(self, add_width=ADD_WIDTH):
+        self.code_size = 1 << add_width
+        self.state_cycles = [0] * 16
+        self.op_count = [0] * 16
+        self.op_cycles = [0] * 16
+        self.ip_count = [0] * self.code_size
+        self.ip_opcode = [None] * self.code_size
+        self.ip_state_cycles = [[0] * 16 for _ in range(self.code_size)]
+        self.jz_taken = 0
+        self.jz_skipped = 0
+        self.dp_min = None
+        self.dp_max = None
+        self.halted = False
+        self._fetch_ip = None
+        self._current = None
+
+    def _charge(self, ip, state, cycles):
+        self.ip_state_cycles[ip][state] += cycles
+        self.op_cycles[self.ip_opcode[ip]] += cycles
+
+    def _retire(self, ip, code):
+        self.ip_count[ip] += 1
+        self.ip_opcode[ip] = code
+        self.op_count[code] += 1
+
+    def transition(self, prev, cycles, state, ip, dp, instruction):
+        """``prev`` lasted ``cycles``; ``state``/``ip``/``dp``/``instruction`` are the new values."""
+        if prev is None or prev == STOP:
+            return
+        self.state_cycles[prev] += cycles
+        if state not in (STOP, START):
+            self.dp_min = dp if self.dp_min is None else min(self.dp_min, dp)
+            self.dp_max = dp if self.dp_max is None else max(self.dp_max, dp)
+
+        if prev == FETCH_DECODE and self._fetch_ip is not None:
+            for i in range(cycles - 1):
+                nop_ip = (self._fetch_ip + i) % self.code_size
+                self._retire(nop_ip, 0)
+                self._charge(nop_ip, FETCH_DECODE, 1)
+            self._current = (self._fetch_ip + cycles - 1) % self.code_size
+            self._retire(self._current, instruction)
+            self._charge(self._current, FETCH_DECODE, 1)
+        elif prev != START and self._current is not None:
+            self._charge(self._current, prev, cycles)
+            if prev == JZ_EXE:
+                if state == LOAD_HA_JMP:
+                    self.jz_taken += 1
+                else:
+                    self.jz_skipped += 1
+
+        if state == FETCH_DECODE:
+            self._fetch_ip = ip
+            self._current = None
+        elif state == STOP:
+            self.halted = True
+            self._fetch_ip = self._current = None
+
+    @property
+    def cycles(self):
+        """Cycles spent outside ``stop``."""
+        return sum(self.state_cycles) - self.state_cycles[STOP]
+
+    @property
+    def instructions(self):
+        return sum(self.op_count)
+
+    def hotspots(self, top=None):
+        """Instruction addresses sorted by the cycles spent on them."""
+        spots = []
+        for ip in range(self.code_size):
+            if not self.ip_count[ip]:
+                continue
+            states = self.ip_state_cycles[ip]
+            spots.append({
+                "ip": ip,
+                "instruction": _opcode_name(self.ip_opcode[ip]),
+                "count": self.ip_count[ip],
+                "cycles": sum(states),
+                "states": {STATE_NAMES[s]: c for s, c in enumerate(states) if c},
+            })
+        spots.sort(key=lambda s: (-s["cycles"], s["ip"]))
+        return spots[:top]
+
+    def to_dict(self, top=None):
+        by_name = {}
+        for code in range(16):
+            if self.op_count[code]:
+                entry = by_name.setdefault(_opcode_name(code), {"count": 0, "cycles": 0})
+                entry["count"] += self.op_count[code]
+                entry["cycles"] += self.op_cycles[code]
+        for entry in by_name.values():
+            entry["cpi"] = entry["cycles"] / entry["count"]
+        instructions = self.instructions
+        jz = self.jz_taken + self.jz_skipped
+        return {
+            "halted": self.halted,
+            "cycles": self.cycles,
+            "instructions": instructions,
+            "cpi": self.cycles / instructions if instructions else None,
+            "states": {name: self.state_cycles[s] for s, name in enumerate(STATE_NAMES)},
+            "opcodes": by_name,
+            "jz": {"taken": self.jz_taken, "skipped": self.jz_skipped,
+                   "taken_ratio": self.jz_taken / jz if jz else None},
+            "dp_range": None if self.dp_min is None else [self.dp_min, self.dp_max],
+            "hotspots": self.hotspots(top),
+        }
+
+    def to_json(self, top=None, **kwargs):
+        return json.dumps(self.to_dict(top), **kwargs)
+
+
+def run_model(rom, tape=(), sinks=(), max_cycles=1 << 20, add_width=ADD_WIDTH):
+    """Feed the state transitions of ``rom`` on the cycle accurate model to ``sinks``; return them."""
+    model = PostCpuModel(rom, tape, add_width)
+    model.step(run=True)
+    state, cycles = model.state, 0
+    while model.cycles < max_cycles:
+        model.step()
+        cycles += 1
+        if model.state != state:
+            for sink in sinks:
+                sink.transition(state, cycles, model.state, model.ip, model.dp, model.instruction)
+            state, cycles = model.state, 0
+        if state == STOP:
+            break
+    return sinks
+
+
+def profile_program(rom, tape=(), max_cycles=1 << 20, add_width=ADD_WIDTH):
+    """Profile of ``rom`` run on the cycle accurate model (``PostCpuModel.step``)."""
+    return run_model(rom, tape, [Profile(add_width)], max_cycles, add_width)[0]
+
+
+class CpuWatcher:
+    """Feed the state transitions of the Post_cpu of ``tb`` to sinks (RTL simulation only).
+
+    ``clk_period``/``units`` must match the cocotb Clock driving ``dut.clk``.
+    """
+
+    def __init__(self, dut, clk_period=10, units="us"):
+        self._period_steps = get_sim_steps(clk_period, units)
+        try:
+            cpu = dut.user_project.my_PostSys.my_cpu
+            self._state, self._ip, self._dp = cpu.state_reg, cpu.IP_reg, cpu.DP_reg
+            self._instruction = cpu.instruction_reg
+            self.add_width = len(cpu.IP_reg)
+        except AttributeError:
+            self._state = None
+            self.add_width = ADD_WIDTH
+        self._task = None
+        self.sinks = ()
+
+    @property
+    def available(self):
+        return self._state is not None
+
+    def start(self, *sinks):
+        """Feed ``sinks`` from now on; call before RUN is asserted."""
+        self.sinks = sinks
+        self._task = cocotb.start_soon(self._watch())
+        return self
+
+    def stop(self):
+        if self._task is not None:
+            self._task.kill()
+            self._task = None
+        return self.sinks
+
+    async def _watch(self):
+        change = Edge(self._state)
+        state = int(self._state.value)
+        since = get_sim_time()
+        while True:
+            await change
+            await ReadOnly()
+            now = get_sim_time()
+            new = int(self._state.value)
+            cycles = round((now - since) / self._period_steps)
+            ip, dp, instruction = int(self._ip.value), int(self._dp.value), int(self._instruction.value)
+            for sink in self.sinks:
+                sink.transition(state, cycles, new, ip, dp, instruction)
+            state, since = new, now
+
+
+class CpuProfiler(CpuWatcher):
+    """Collect a ``Profile`` of the Post_cpu of ``tb`` (RTL simulation only)."""
+
+    def __init__(self, dut, clk_period=10, units="us"):
+        super().__init__(dut, clk_period, units)
+        self.profile = Profile(self.add_width)
+
+    def start(self):
+        """Start a new ``profile``; call before RUN is asserted."""
+        self.profile = Profile(self.add_width)
+        return super().start(self.profile)
+
+    def stop(self):
+        super().stop()
+        return self.profile
+
+
+def main(argv=None):
+    from epm_asm import assemble, source_tape
+
+    argv = sys.argv[1:] if argv is None else argv
+    for path in argv:
+        with open(path) as f:
+            source = f.read()
+        profile = profile_program(assemble(source), source_tape(source))
+        print(json.dumps({path: profile.to_dict()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
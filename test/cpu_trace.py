@@ -0,0 +1,300 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Instruction level execution traces of Post_cpu runs.
+
+A ``Trace`` holds one record per retired instruction (nops included)
+in fixed width columns:
+
+    cycle   array('I')  run cycle of the fetch (START is cycle 0)
+    ip      array('B')  address of the instruction
+    opcode  array('B')  0x0-0xF, as fetched
+    dp      array('B')  DP when the instruction executes
+    flags   array('B')  READ: tape[DP] before the instruction
+                        WRITE/WRITTEN: set/clr and the bit written
+                        JUMP: the next instruction is at ``target``
+    target  array('B')  jump target of jmp and taken jz, else 0
+
+ip, dp and target are ``array('H')`` in builds with ``ADD_WIDTH`` above
+8 (``Trace(tape, add_width)``). A ``Trace`` is a sink of the state
+transitions of cpu_profiler.py, like ``Profile``: ``CpuTracer`` (or a
+``CpuWatcher`` feeding both) on the RTL, or ``trace_program`` on the
+model. Tape bits come from a shadow copy of the tape, updated by the
+set/clr of the trace itself.
+
+``save()`` writes the columns to a little endian binary file::
+
+    "POSTTRC2", records (u32), cycles (u32), halted (u32), add_width (u32),
+    then cycle[n] (u32), ip[n], opcode[n] (u8), dp[n], flags[n] (u8), target[n]
+
+with ip, dp and target u8 up to 8 bits and u16 above.
+
+and ``open_trace()`` maps it back with ``mmap``: the columns are NumPy
+views of the file, so the queries (``where``, ``writes``,
+``ip_histogram``, ...) run on traces of millions of instructions without
+reading them in::
+
+    python cpu_trace.py programs/unary_increment.epm -o inc.trc
+    python cpu_trace.py inc.trc --writes 0x03 --ip-histogram 0 100
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+import numpy as np
+
+from cpu_profiler import CpuWatcher, _opcode_name, run_model
+from post_model import ADD_WIDTH, CLR, FETCH_DECODE, JMP_EXE, NOP, SET, STOP
+
+MAGIC = b"POSTTRC2"
+HEADER = struct.Struct("<8sIIII")
+
+READ = 0x1
+WRITE = 0x2
+WRITTEN = 0x4
+JUMP = 0x8
+
+Step = namedtuple("Step", "cycle ip opcode dp read write target")
+
+
+def columns(add_width=ADD_WIDTH):
+    """(name, array typecode, NumPy dtype of the file) of each column for ``add_width``."""
+    if not 1 <= add_width <= 16:
+        raise ValueError(f"traces support ADD_WIDTH 1-16, not {add_width}")
+    address = ("B", "u1") if add_width <= 8 else ("H", "<u2")
+    return (
+        ("cycle", "I", "<u4"),
+        ("ip",) + address,
+        ("opcode", "B", "u1"),
+        ("dp",) + address,
+        ("flags", "B", "u1"),
+        ("target",) + address,
+    )
+
+
+class Trace:
+    """Columns of retired instructions; built with ``transition`` or mapped by ``open_trace``."""
+
+    def __init__(self, tape=(), add_width=ADD_WIDTH):
+        self.add_width = add_width
+        self.size = 1 << add_width
+        self._columns = columns(add_width)
+        self.columns = {name: array(code) for name, code, _ in self._columns}
+        self.cycles = 0
+        self.halted = False
+        self._tape = bytearray(self.size)
+        for i, bit in enumerate(list(tape)[:self.size]):
+            self._tape[i] = int(bit) & 1
+        self._now = 0
+        self._fetch_ip = None
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.columns["cycle"])
+
+    def __getitem__(self, i):
+        c = self.columns
+        flags = int(c["flags"][i])
+        return Step(int(c["cycle"][i]), int(c["ip"][i]), int(c["opcode"][i]), int(c["dp"][i]),
+                    flags & READ, (flags & WRITTEN) // WRITTEN if flags & WRITE else None,
+                    int(c["target"][i]) if flags & JUMP else None)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    # building
+
+    def _append(self, cycle, ip, opcode, dp):
+        flags = READ if self._tape[dp] else 0
+        if opcode in (SET, CLR):
+            self._tape[dp] = int(opcode == SET)
+            flags |= WRITE | (WRITTEN if opcode == SET else 0)
+        c = self.columns
+        c["cycle"].append(cycle)
+        c["ip"].append(ip)
+        c["opcode"].append(opcode)
+        c["dp"].append(dp)
+        c["flags"].append(flags)
+        c["target"].append(0)
+
+    def transition(self, prev, cycles, state, ip, dp, instruction):
+        """``prev`` lasted ``cycles``; ``state``/``ip``/``dp``/``instruction`` are the new values."""
+        if prev is None or prev == STOP:
+            return
+        if prev == FETCH_DECODE and self._fetch_ip is not None:
+            for i in range(cycles):
+                code = NOP if i < cycles - 1 else instruction
+                self._append(self._now + i, (self._fetch_ip + i) % self.size, code, dp)
+        elif prev == JMP_EXE and len(self):
+            self.columns["flags"][-1] |= JUMP
+            self.columns["target"][-1] = ip
+        self._now += cycles
+        self.cycles = self._now
+
+        if state == FETCH_DECODE:
+            self._fetch_ip = ip
+        elif state == STOP:
+            self.halted = True
+            self._fetch_ip = None
+
+    # storage
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self), self.cycles, int(self.halted), self.add_width))
+            for name, code, _ in self._columns:
+                column = self.columns[name]
+                if sys.byteorder == "big" and column.itemsize > 1:
+                    column = array(code, column)
+                    column.byteswap()
+                column.tofile(f)
+
+    def close(self):
+        if self._mmap is not None:
+            self.columns = {name: array(code) for name, code, _ in self._columns}
+            self._mmap.close()
+            self._mmap = None
+
+    # queries
+
+    def _np(self, name):
+        column = self.columns[name]
+        return column if isinstance(column, np.ndarray) else np.frombuffer(column, dtype=column.typecode)
+
+    def span(self, start=None, stop=None):
+        """Slice of the records fetched in cycles [``start``, ``stop``)."""
+        cycle = self._np("cycle")
+        lo = 0 if start is None else int(np.searchsorted(cycle, start, "left"))
+        hi = len(cycle) if stop is None else int(np.searchsorted(cycle, stop, "left"))
+        return slice(lo, hi)
+
+    def where(self, ip=None, opcode=None, dp=None, flags=None, start=None, stop=None):
+        """Indices of the records that match every given field, within cycles [start, stop).
+
+        ``flags`` selects the records that have all of those flag bits set.
+        """
+        window = self.span(start, stop)
+        mask = np.ones(window.stop - window.start, dtype=bool)
+        for name, value in (("ip", ip), ("opcode", opcode), ("dp", dp)):
+            if value is not None:
+                mask &= self._np(name)[window] == value
+        if flags is not None:
+            mask &= (self._np("flags")[window] & flags) == flags
+        return np.flatnonzero(mask) + window.start
+
+    def writes(self, dp=None, start=None, stop=None):
+        """``Step`` of every set/clr (to ``dp`` only if given)."""
+        return [self[i] for i in self.where(dp=dp, flags=WRITE, start=start, stop=stop)]
+
+    def jumps(self, target=None, start=None, stop=None):
+        """``Step`` of every jmp and taken jz (to ``target`` only if given)."""
+        found = self.where(flags=JUMP, start=start, stop=stop)
+        if target is not None:
+            found = found[self._np("target")[found] == target]
+        return [self[i] for i in found]
+
+    def ip_histogram(self, start=None, stop=None):
+        """{ip: instructions retired there} over cycles [start, stop)."""
+        counts = np.bincount(self._np("ip")[self.span(start, stop)], minlength=self.size)
+        return {int(ip): int(counts[ip]) for ip in np.flatnonzero(counts)}
+
+    def opcode_histogram(self, start=None, stop=None):
+        """{instruction name: count} over cycles [start, stop)."""
+        counts = np.bincount(self._np("opcode")[self.span(start, stop)], minlength=16)
+        histogram = {}
+        for code in np.flatnonzero(counts):
+            name = _opcode_name(int(code))
+            histogram[name] = histogram.get(name, 0) + int(counts[code])
+        return histogram
+
+    def dp_trace(self, start=None, stop=None):
+        """DP of each record over cycles [start, stop) (a NumPy view)."""
+        return self._np("dp")[self.span(start, stop)]
+
+    def summary(self):
+        return {
+            "instructions": len(self),
+            "cycles": self.cycles,
+            "halted": self.halted,
+            "opcodes": self.opcode_histogram(),
+            "writes": int(np.count_nonzero(self._np("flags") & WRITE)),
+            "jumps": int(np.count_nonzero(self._np("flags") & JUMP)),
+        }
+
+
+def open_trace(path):
+    """Read-only ``Trace`` whose columns are NumPy views of the mapped file ``path``."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, count, cycles, halted, add_width = HEADER.unpack_from(mm)
+    if magic != MAGIC:
+        mm.close()
+        raise ValueError(f"{path} is not a Post_cpu trace")
+    trace = Trace(add_width=add_width)
+    trace.cycles, trace.halted, trace._mmap = cycles, bool(halted), mm
+    offset = HEADER.size
+    for name, _, dtype in trace._columns:
+        column = np.frombuffer(mm, dtype=dtype, count=count, offset=offset)
+        trace.columns[name] = column
+        offset += column.nbytes
+    return trace
+
+
+def trace_program(rom, tape=(), max_cycles=1 << 20, add_width=ADD_WIDTH):
+    """Trace of ``rom`` run on the cycle accurate model (``PostCpuModel.step``)."""
+    return run_model(rom, tape, [Trace(tape, add_width)], max_cycles, add_width)[0]
+
+
+class CpuTracer(CpuWatcher):
+    """Collect a ``Trace`` of the Post_cpu of ``tb`` (RTL simulation only)."""
+
+    def __init__(self, dut, clk_period=10, units="us"):
+        super().__init__(dut, clk_period, units)
+        self.trace = Trace(add_width=self.add_width)
+
+    def start(self, tape=()):
+        """Start a new ``trace`` of a run on ``tape``; call before RUN is asserted."""
+        self.trace = Trace(tape, self.add_width)
+        return super().start(self.trace)
+
+    def stop(self):
+        super().stop()
+        return self.trace
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="trace file, or an EPM program to trace on the model")
+    parser.add_argument("-o", "--output", help="save the trace of an EPM program here")
+    parser.add_argument("--writes", type=lambda s: int(s, 0), metavar="DP",
+                        help="list the set/clr to DP")
+    parser.add_argument("--ip-histogram", type=int, nargs=2, metavar=("START", "STOP"),
+                        help="instructions per IP in cycles [START, STOP)")
+    args = parser.parse_args(argv)
+
+    if args.path.endswith(".epm"):
+        from epm_asm import assemble, source_tape
+
+        with open(args.path) as f:
+            source = f.read()
+        trace = trace_program(assemble(source), source_tape(source))
+        if args.output:
+            trace.save(args.output)
+    else:
+        trace = open_trace(args.path)
+    print(trace.summary())
+    if args.writes is not None:
+        for step in trace.writes(args.writes):
+            print(step)
+    if args.ip_histogram:
+        for ip, count in trace.ip_histogram(*args.ip_histogram).items():
+            print(f"0x{ip:02X} {count}")
+    trace.close()
+
+
+if __name__ == "__main__":
+    main()
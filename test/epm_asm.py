@@ -0,0 +1,220 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Assembler and disassembler for the EPM instruction set (src/MPM_cpu.v).
+
+Source format, one statement per line::
+
+    ; comments start with ';' or '#'
+    loop:   jz   done        ; jmp/jz take a label or an 8 bit address
+            incdp
+            jmp  loop
+    done:   set
+            stop
+            .org 0x80        ; continue assembling at 0x80
+            .nibble 0xA, 0xB ; raw nibbles
+
+A ``; tape: 0110...`` comment gives the starting tape of the program
+(see ``source_tape``).
+
+jmp/jz targets are emitted as two nibbles after the opcode: the high
+nibble (hadd) first, then the low nibble (ladd). The result is a 256
+nibble ROM image (``bytearray``). ``assemble(source, add_width=12)``
+assembles for a wider build (``ADD_WIDTH`` of src/MPM_cpu.v): a 4096
+nibble image and three nibble targets, most significant first; the
+other functions take the same ``add_width``. A numeric target may use
+every bit of its nibbles (the CPU keeps the low ``add_width`` bits), so
+``listing`` of any image assembles back to it. ``assemble_cached`` keeps assembled
+images on disk under the SHA-256 of the source and width, so a program library
+only reassembles the files that changed.
+"""
+
+import hashlib
+import os
+import re
+from pathlib import Path
+
+from post_model import ADD_WIDTH, JMP, JZ, OPCODE_NAMES, jump_nibbles
+
+ASM_VERSION = "1"
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("EPM_CACHE_DIR", Path(__file__).parent / ".epm_cache"))
+
+_OPCODES = {name: code for code, name in enumerate(OPCODE_NAMES)}
+_LABEL = re.compile(r"^[A-Za-z_.][\w.]*$")
+_TAPE = re.compile(r"^[ \t]*[;#][ \t]*tape:([01 \t]*)$", re.MULTILINE)
+
+
+class AsmError(ValueError):
+    """Error in EPM source, reported with its line number."""
+
+    def __init__(self, lineno, message):
+        super().__init__(f"line {lineno}: {message}")
+        self.lineno = lineno
+
+
+def _number(text, lineno, limit):
+    try:
+        value = int(text, 0)
+    except ValueError:
+        raise AsmError(lineno, f"bad number {text!r}") from None
+    if not 0 <= value <= limit:
+        raise AsmError(lineno, f"{text} out of range 0..0x{limit:X}")
+    return value
+
+
+def _statements(source):
+    for lineno, line in enumerate(source.splitlines(), 1):
+        line = re.split(r"[;#]", line, maxsplit=1)[0].strip()
+        while line:
+            head, sep, rest = line.partition(":")
+            if not sep or " " in head.strip() or "\t" in head.strip():
+                break
+            label = head.strip()
+            if not _LABEL.match(label):
+                raise AsmError(lineno, f"bad label {label!r}")
+            yield lineno, label + ":", []
+            line = rest.strip()
+        if line:
+            mnemonic, *rest = line.split(None, 1)
+            operands = rest[0] if rest else ""
+            args = [a.strip() for a in operands.split(",")] if operands.strip() else []
+            yield lineno, mnemonic.lower(), args
+
+
+def assemble(source, add_width=ADD_WIDTH):
+    """Assemble EPM ``source`` into a 256 nibble (2**add_width) ``bytearray`` ROM image."""
+    statements = list(_statements(source))
+    code_size, nibbles = 1 << add_width, jump_nibbles(add_width)
+
+    # pass 1: addresses of the labels
+    symbols = {}
+    addr = 0
+    for lineno, mnemonic, args in statements:
+        if mnemonic.endswith(":"):
+            label = mnemonic[:-1]
+            if label in symbols:
+                raise AsmError(lineno, f"label {label!r} defined twice")
+            symbols[label] = addr
+        elif mnemonic == ".org":
+            if len(args) != 1:
+                raise AsmError(lineno, ".org takes one address")
+            addr = _number(args[0], lineno, code_size - 1)
+        elif mnemonic == ".nibble":
+            addr += len(args)
+        elif mnemonic in ("jmp", "jz"):
+            addr += 1 + nibbles
+        elif mnemonic in _OPCODES:
+            addr += 1
+        else:
+            raise AsmError(lineno, f"unknown instruction {mnemonic!r}")
+
+    # pass 2: emit nibbles
+    rom = bytearray(code_size)
+    used = set()
+
+    def emit(lineno, nibble):
+        nonlocal addr
+        if addr >= code_size:
+            raise AsmError(lineno, f"program does not fit the {code_size} nibble code space")
+        if addr in used:
+            raise AsmError(lineno, f"address 0x{addr:02X} assembled twice")
+        used.add(addr)
+        rom[addr] = nibble
+        addr += 1
+
+    addr = 0
+    for lineno, mnemonic, args in statements:
+        if mnemonic.endswith(":"):
+            continue
+        if mnemonic == ".org":
+            addr = _number(args[0], lineno, code_size - 1)
+        elif mnemonic == ".nibble":
+            for arg in args:
+                emit(lineno, _number(arg, lineno, 0xF))
+        elif mnemonic in ("jmp", "jz"):
+            if len(args) != 1:
+                raise AsmError(lineno, f"{mnemonic} takes one target")
+            if args[0] in symbols:
+                target = symbols[args[0]]
+            elif args[0][0].isdigit():
+                # any value of the target nibbles; the CPU keeps the low add_width bits
+                target = _number(args[0], lineno, (1 << 4 * nibbles) - 1)
+            else:
+                raise AsmError(lineno, f"unknown label {args[0]!r}")
+            emit(lineno, _OPCODES[mnemonic])
+            for shift in range(4 * (nibbles - 1), -1, -4):
+                emit(lineno, (target >> shift) & 0xF)
+        else:
+            if args:
+                raise AsmError(lineno, f"{mnemonic} takes no operands")
+            emit(lineno, _OPCODES[mnemonic])
+    return rom
+
+
+def source_tape(source):
+    """Starting tape given by ``; tape: 1110...`` comment lines (cells from DP=0)."""
+    return [int(c) for line in _TAPE.findall(source) for c in line if c in "01"]
+
+
+def disassemble(rom, start=0, end=None, add_width=ADD_WIDTH):
+    """Return ``(address, text)`` pairs for ``rom[start:end]`` of an ``add_width`` build.
+
+    Trailing nops are dropped when ``end`` is not given. Opcodes 0x8-0xF
+    are shown as ``.nibble`` (they stop the CPU like ``stop``).
+    """
+    if end is None:
+        end = len(rom)
+        while end > start and rom[end - 1] == 0:
+            end -= 1
+    nibbles = jump_nibbles(add_width)
+    lines = []
+    addr = start
+    while addr < end:
+        code = rom[addr]
+        if code in (JMP, JZ) and addr + nibbles < len(rom):
+            target = 0
+            for nibble in rom[addr + 1:addr + 1 + nibbles]:
+                target = (target << 4) | nibble
+            lines.append((addr, f"{OPCODE_NAMES[code]} 0x{target:0{nibbles}X}"))
+            addr += 1 + nibbles
+        elif code < len(OPCODE_NAMES) and code not in (JMP, JZ):
+            lines.append((addr, OPCODE_NAMES[code]))
+            addr += 1
+        else:
+            lines.append((addr, f".nibble 0x{code:X}"))
+            addr += 1
+    return lines
+
+
+def listing(rom, start=0, end=None, add_width=ADD_WIDTH):
+    """Disassembly as source text that assembles back to the same image."""
+    return "\n".join(f".org 0x{a:02X}\n    {text}" if i == 0 and a else f"    {text}"
+                     for i, (a, text) in enumerate(disassemble(rom, start, end, add_width))) + "\n"
+
+
+def source_hash(source, add_width=ADD_WIDTH):
+    return hashlib.sha256(f"epm-asm {ASM_VERSION} {add_width}\n{source}".encode()).hexdigest()
+
+
+def assemble_cached(source, cache_dir=None, add_width=ADD_WIDTH):
+    """Like ``assemble`` but reuse the image cached for the same source and width."""
+    cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+    path = cache_dir / f"{source_hash(source, add_width)}.rom"
+    try:
+        image = path.read_bytes()
+        if len(image) == 1 << add_width:
+            return bytearray(image)
+    except OSError:
+        pass
+    rom = assemble(source, add_width)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(rom)
+    os.replace(tmp, path)
+    return rom
+
+
+def assemble_file(path, cache_dir=None, add_width=ADD_WIDTH):
+    """Assemble an ``.epm`` file through the image cache."""
+    return assemble_cached(Path(path).read_text(), cache_dir, add_width)
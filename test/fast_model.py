@@ -0,0 +1,321 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Loop accelerated Post_cpu model with the cycle counts of the RTL.
+
+``FastPostModel.run()`` returns the same ``PostResult`` as
+``run_program`` (post_model.py), for any budget, but skips over loops:
+
+* Blocks: the code from an IP up to the next jz or stop has no data
+  dependence, so it is compiled once into its tape writes (offsets from
+  DP), its DP delta (mod 256: a run of incdp/decdp is one DP update) and
+  its cycles. Jumps are followed inside the block; a block that comes
+  back to an IP it already went through ends there.
+* Loop summaries: once execution comes back to a block start P, one
+  iteration from P back to P is run symbolically. It reads some cells
+  (offsets from DP) that decide its path and leaves writes, a DP shift D
+  and a cycle count C that only depend on those values. Summaries are
+  memoized per P in a trie over the values read, so later iterations
+  with the same local tape cost one lookup.
+* Leaps: iteration j of a summary reads the cells at DP + j*D + offset,
+  holding either the original tape or the bit written by an earlier
+  iteration. That tells how many consecutive iterations follow the same
+  path, and all of them are applied at once (n*D, n*C and the writes of
+  the last 256 / gcd(D, 256) iterations). A loop that would follow the
+  same path forever only stops at the budget.
+* Periods: the machine state (IP, DP, tape) at each loop head is kept
+  for a while; when one comes back, the run is periodic and the whole
+  periods that fit in the budget are skipped.
+
+Close to the budget the model finishes with ``PostCpuModel.resume()``, so
+results of programs that do not halt also match instruction for
+instruction. Expected results and exact timeouts of long programs::
+
+    python fast_model.py programs/unary_increment.epm --max-cycles 1000000000
+"""
+
+import argparse
+import json
+from collections import namedtuple
+from math import gcd
+
+import numpy as np
+
+from post_model import (CLR, CODE_SIZE, CYCLES_EXE, CYCLES_JMP, CYCLES_JZ_SKIP, CYCLES_JZ_TAKEN, CYCLES_NOP,
+                        CYCLES_START, CYCLES_STOP, DECDP, INCDP, JMP, JZ, NOP, SET, TAPE_SIZE, PostCpuModel,
+                        PostResult)
+
+# Block terminators: the instruction at ``end`` is a jz, a stop, or the
+# start of a block that the block went through already.
+END_JZ = 0
+END_STOP = 1
+END_GOTO = 2
+
+# Jz decisions after which a loop iteration is given up on
+MAX_DECISIONS = 256
+# Iterations checked in Python before a leap is checked with NumPy
+SHORT_RUN = 8
+# Machine states at loop heads kept to find a run that repeats itself
+MAX_STATES = 1 << 14
+
+Block = namedtuple("Block", "writes delta cycles kind end")
+Summary = namedtuple("Summary", "reads writes shift cycles last")
+
+
+class _Node:
+    """Trie node: the offset read next, and the subtree for each value of it."""
+
+    __slots__ = ("offset", "children")
+
+    def __init__(self, offset):
+        self.offset = offset
+        self.children = [None, None]
+
+
+# Leaf of the trie for iterations that do not come back to P
+_NO_LOOP = "no loop"
+
+
+class FastPostModel:
+    """Compiled blocks and loop summaries of one program (``rom``), kept across runs."""
+
+    def __init__(self, rom=()):
+        self.model = PostCpuModel(rom)
+        self.rom = self.model.rom
+        self._blocks = [None] * CODE_SIZE
+        self._tries = {}
+        self.stats = {"blocks": 0, "summaries": 0, "leaps": 0, "iterations": 0,
+                      "periods": 0, "resumed_cycles": 0}
+
+    # blocks
+
+    def _jz_target(self, ip):
+        rom = self.rom
+        return (rom[(ip + 1) & 0xFF] << 4) | rom[(ip + 2) & 0xFF]
+
+    def block(self, ip):
+        block = self._blocks[ip]
+        if block is None:
+            block = self._blocks[ip] = self._compile(ip)
+            self.stats["blocks"] += 1
+        return block
+
+    def _compile(self, start):
+        rom = self.rom
+        writes = {}
+        delta = cycles = 0
+        seen = set()
+        ip = start
+        while True:
+            if ip in seen:
+                kind = END_GOTO
+                break
+            seen.add(ip)
+            code = rom[ip]
+            if code == NOP:
+                ip, cycles = (ip + 1) & 0xFF, cycles + CYCLES_NOP
+            elif code in (INCDP, DECDP):
+                delta += 1 if code == INCDP else -1
+                ip, cycles = (ip + 1) & 0xFF, cycles + CYCLES_EXE
+            elif code in (SET, CLR):
+                writes[delta & 0xFF] = int(code == SET)
+                ip, cycles = (ip + 1) & 0xFF, cycles + CYCLES_EXE
+            elif code == JMP:
+                ip, cycles = self._jz_target(ip), cycles + CYCLES_JMP
+            else:
+                kind = END_JZ if code == JZ else END_STOP
+                break
+        return Block(tuple(writes.items()), delta & 0xFF, cycles, kind, ip)
+
+    def _branch(self, block, bit):
+        """(next IP, cycles) of the jz ending ``block`` when it reads ``bit``."""
+        if bit:
+            return (block.end + 3) & 0xFF, CYCLES_JZ_SKIP
+        return self._jz_target(block.end), CYCLES_JZ_TAKEN
+
+    # loop summaries
+
+    def _summarize(self, start, dp, tape):
+        """Run one iteration from ``start`` back to it on a copy; a ``Summary`` or ``_NO_LOOP``."""
+        reads, written = [], {}
+        offset = cycles = 0
+        ip = start
+        for _ in range(MAX_DECISIONS):
+            block = self.block(ip)
+            for w, bit in block.writes:
+                written[(offset + w) & 0xFF] = bit
+            offset = (offset + block.delta) & 0xFF
+            cycles += block.cycles
+            if block.kind == END_STOP:
+                return reads, _NO_LOOP
+            if block.kind == END_GOTO:
+                ip = block.end
+            else:
+                if offset in written:
+                    bit = written[offset]
+                else:
+                    bit = tape[(dp + offset) & 0xFF]
+                    if all(o != offset for o, _ in reads):
+                        reads.append((offset, bit))
+                ip, spent = self._branch(block, bit)
+                cycles += spent
+            if ip == start:
+                return reads, self._leap_plan(reads, written, offset, cycles)
+        return reads, _NO_LOOP
+
+    @staticmethod
+    def _leap_plan(reads, written, shift, cycles):
+        """``Summary`` with, per cell read, the iterations back to its last writer and the bit."""
+        period = TAPE_SIZE // gcd(shift, TAPE_SIZE)
+        last = []
+        for t, _ in reads:
+            best = None
+            for w, bit in written.items():
+                # smallest m >= 1 with m * shift == w - t (mod 256)
+                m = next((m for m in range(1, period + 1) if (m * shift - (w - t)) % TAPE_SIZE == 0), None)
+                if m is not None and (best is None or m < best[0]):
+                    best = (m, bit)
+            last.append(best)
+        return Summary(tuple(reads), tuple(written.items()), shift, cycles, tuple(last))
+
+    def _lookup(self, ip, dp, tape):
+        node = self._tries.get(ip)
+        while isinstance(node, _Node):
+            node = node.children[tape[(dp + node.offset) & 0xFF]]
+        if node is not None:
+            return node
+        reads, leaf = self._summarize(ip, dp, tape)
+        self.stats["summaries"] += 1
+        self._insert(ip, reads, leaf)
+        return leaf
+
+    def _insert(self, ip, reads, leaf):
+        if not reads:
+            self._tries[ip] = leaf
+            return
+        node = self._tries.get(ip)
+        if node is None:
+            node = self._tries[ip] = _Node(reads[0][0])
+        for k, (offset, bit) in enumerate(reads):
+            assert node.offset == offset, "iterations from the same IP read in the same order"
+            if k + 1 == len(reads):
+                node.children[bit] = leaf
+            else:
+                child = node.children[bit]
+                if child is None:
+                    child = node.children[bit] = _Node(reads[k + 1][0])
+                node = child
+
+    def _iterations(self, summary, dp, tape, limit):
+        """How many iterations of ``summary`` in a row (at most ``limit``) follow its path from ``dp``."""
+        shift = summary.shift
+        # Short runs (carry chains, short scans) are cheaper to check one by one
+        for j in range(1, min(limit, SHORT_RUN)):
+            base = dp + j * shift
+            for (t, value), last in zip(summary.reads, summary.last):
+                seen = last[1] if last is not None and j >= last[0] else tape[(base + t) & 0xFF]
+                if seen != value:
+                    return j
+        if limit <= SHORT_RUN:
+            return limit
+        period = TAPE_SIZE // gcd(shift, TAPE_SIZE)
+        horizon = max([entry[0] for entry in summary.last if entry] + [1]) + period
+        j = np.arange(SHORT_RUN, min(horizon, limit))
+        ok = np.ones(len(j), dtype=bool)
+        cells = np.frombuffer(tape, dtype=np.uint8)
+        for (t, value), last in zip(summary.reads, summary.last):
+            seen = cells[(dp + j * shift + t) & 0xFF]
+            if last is not None:
+                seen = np.where(j >= last[0], last[1], seen)
+            ok &= seen == value
+        bad = np.flatnonzero(~ok)
+        return int(j[bad[0]]) if len(bad) else limit
+
+    def _apply(self, summary, dp, tape, n):
+        shift = summary.shift
+        period = TAPE_SIZE // gcd(shift, TAPE_SIZE)
+        for j in range(max(0, n - period), n):
+            base = dp + j * shift
+            for w, bit in summary.writes:
+                tape[(base + w) & 0xFF] = bit
+        return (dp + n * shift) & 0xFF
+
+    # execution
+
+    def run(self, tape=(), max_cycles=1 << 20):
+        """``PostResult`` of a run from reset on ``tape``, as ``run_program`` gives it."""
+        cells = bytearray(TAPE_SIZE)
+        for i, bit in enumerate(list(tape)[:TAPE_SIZE]):
+            cells[i] = int(bit) & 1
+        arrivals = [0] * CODE_SIZE
+        states = {}
+        stats = self.stats
+        ip, dp, cycles = 0, 0, CYCLES_START
+
+        while True:
+            arrivals[ip] += 1
+            if arrivals[ip] > 1:
+                summary = self._lookup(ip, dp, cells)
+                if summary is not _NO_LOOP:
+                    # A whole machine state seen before: it repeats until the budget
+                    state = (ip, dp, bytes(cells))
+                    if state in states:
+                        period = cycles - states.pop(state)
+                        repeats = (max_cycles - 1 - cycles) // period
+                        cycles += repeats * period
+                        stats["periods"] += repeats
+                    elif len(states) < MAX_STATES:
+                        states[state] = cycles
+                    limit = (max_cycles - 1 - cycles) // summary.cycles
+                    if limit >= 1:
+                        n = self._iterations(summary, dp, cells, limit)
+                        dp = self._apply(summary, dp, cells, n)
+                        cycles += n * summary.cycles
+                        stats["leaps"] += 1
+                        stats["iterations"] += n
+                        continue
+
+            block = self.block(ip)
+            if cycles + block.cycles + CYCLES_JZ_TAKEN >= max_cycles:
+                break
+            for w, bit in block.writes:
+                cells[(dp + w) & 0xFF] = bit
+            dp = (dp + block.delta) & 0xFF
+            cycles += block.cycles
+            if block.kind == END_STOP:
+                return PostResult(True, cycles + CYCLES_STOP, (block.end + 1) & 0xFF, dp, cells)
+            if block.kind == END_GOTO:
+                ip = block.end
+            else:
+                ip, spent = self._branch(block, cells[dp])
+                cycles += spent
+
+        # Near the budget: instruction by instruction, like run_program
+        stats["resumed_cycles"] += max(0, max_cycles - cycles)
+        self.model.tape = type(self.model.tape)(cells)
+        return self.model.resume(ip, dp, cycles, max_cycles)
+
+
+def fast_run_program(rom, tape=(), max_cycles=1 << 20):
+    """``run_program`` with loop acceleration (see ``FastPostModel``)."""
+    return FastPostModel(rom).run(tape, max_cycles)
+
+
+def main(argv=None):
+    from epm_asm import assemble, source_tape
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("programs", nargs="+", help="EPM source files")
+    parser.add_argument("--max-cycles", type=int, default=1 << 40, help="cycle budget")
+    args = parser.parse_args(argv)
+    for path in args.programs:
+        with open(path) as f:
+            source = f.read()
+        model = FastPostModel(assemble(source))
+        result = model.run(source_tape(source), args.max_cycles)
+        print(json.dumps({path: {"halted": result.halted, "cycles": result.cycles, "ip": result.ip,
+                                 "dp": result.dp, "stats": model.stats}}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
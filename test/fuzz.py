@@ -0,0 +1,246 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Program generation, coverage and shrinking for the RTL vs model fuzzer.
+
+``Fuzzer.next_batch()`` returns a batch of halting programs with their
+expected results. Candidates are generated in NumPy (random programs and
+mutations of the corpus), run in lock-step on ``CoverageBatch`` and kept
+when they halt; candidates that reach new coverage join the corpus.
+
+Coverage features are AFL-like: hit counts of each (previous opcode,
+opcode) pair, bucketed by powers of two, plus jz taken/skipped, DP
+wrap-around in both directions and IP wrap-around. Every opcode,
+including 0x8-0xF (the ``default : state_next = stop`` branch), is a
+separate feature, and ``fsm_transitions`` maps the features seen to the
+Post_cpu FSM transitions they exercise. Both ``stop`` and the ``default``
+branch go from fetch_decode to stop, so ``decode_branches`` also reports
+the branches of the decode case statement that were taken.
+
+``shrink`` reduces a failing program and tape to a minimal reproducer
+for any async predicate, e.g. "the RTL disagrees with the model".
+"""
+
+import numpy as np
+
+from batch_model import PostBatch
+from epm_asm import listing
+from post_model import (CLR, CLR_EXE, CODE_SIZE, DECDP, DECDP_EXE, FETCH_DECODE, HALT, INCDP, INCDP_EXE,
+                        JMP, JMP_EXE, JZ, JZ_EXE, LOAD_HA_JMP, LOAD_LA_JMP, NOP, OPCODE_NAMES, SET, SET_EXE,
+                        START, STATE_NAMES, STOP, TAPE_SIZE, run_program)
+
+# Feature columns of CoverageBatch.hits
+_EDGES = 17 * 16            # (previous opcode or 16 at start, opcode)
+JZ_TAKEN = _EDGES
+JZ_SKIPPED = _EDGES + 1
+DP_WRAP_UP = _EDGES + 2
+DP_WRAP_DOWN = _EDGES + 3
+IP_WRAP = _EDGES + 4
+N_FEATURES = _EDGES + 5
+
+# Opcode weights of random programs: mostly 0x0-0x6, a few stops of every kind
+_WEIGHTS = np.array([3, 4, 2, 3, 3, 3, 4, 1] + [0.25] * 8)
+_WEIGHTS /= _WEIGHTS.sum()
+
+
+class CoverageBatch(PostBatch):
+    """``PostBatch`` that also counts the coverage features of every machine."""
+
+    def __init__(self, roms, tapes=None):
+        super().__init__(roms, tapes)
+        self.hits = np.zeros((len(self), N_FEATURES), dtype=np.int32)
+        self._prev = np.full(len(self), 16, dtype=np.int64)
+
+    def step(self):
+        a = self._active
+        if len(a):
+            ip, dp = self.ip[a], self.dp[a]
+            code = self.rom[a, ip].astype(np.int64)
+            cell = self.tape[a, dp]
+            self.hits[a, self._prev[a] * 16 + code] += 1
+            self.hits[a, JZ_TAKEN] += (code == JZ) & ~cell
+            self.hits[a, JZ_SKIPPED] += (code == JZ) & cell
+            self.hits[a, DP_WRAP_UP] += (code == INCDP) & (dp == 0xFF)
+            self.hits[a, DP_WRAP_DOWN] += (code == DECDP) & (dp == 0)
+            self.hits[a, IP_WRAP] += (ip == 0xFF) & (code <= CLR)
+            self._prev[a] = code
+        return super().step()
+
+    def features(self, i):
+        """Coverage features of machine ``i``: (feature, hit count bucket) pairs."""
+        hits = self.hits[i]
+        return {(int(f), int(hits[f]).bit_length()) for f in np.flatnonzero(hits)}
+
+
+def fsm_transitions(features):
+    """Post_cpu FSM transitions (from, to) exercised by ``features``."""
+    seen = {f for f, _ in features}
+    codes = {f % 16 for f in seen if f < _EDGES}
+    transitions = set()
+    if codes:
+        transitions |= {(STOP, START), (START, FETCH_DECODE)}
+    exe = {INCDP: INCDP_EXE, DECDP: DECDP_EXE, SET: SET_EXE, CLR: CLR_EXE}
+    for code in codes:
+        if code == NOP:
+            transitions.add((FETCH_DECODE, FETCH_DECODE))
+        elif code in exe:
+            transitions |= {(FETCH_DECODE, exe[code]), (exe[code], FETCH_DECODE)}
+        elif code == JMP:
+            transitions.add((FETCH_DECODE, LOAD_HA_JMP))
+        elif code == JZ:
+            transitions.add((FETCH_DECODE, JZ_EXE))
+        else:
+            transitions.add((FETCH_DECODE, STOP))
+    if JZ_SKIPPED in seen:
+        transitions.add((JZ_EXE, FETCH_DECODE))
+    if JZ_TAKEN in seen:
+        transitions.add((JZ_EXE, LOAD_HA_JMP))
+    if JMP in codes or JZ_TAKEN in seen:
+        transitions |= {(LOAD_HA_JMP, LOAD_LA_JMP), (LOAD_LA_JMP, JMP_EXE), (JMP_EXE, FETCH_DECODE)}
+    return transitions
+
+
+ALL_TRANSITIONS = fsm_transitions({(f, 1) for f in range(N_FEATURES)})
+
+# Branch of the fetch_decode case statement taken by opcodes 0x8-0xF
+DEFAULT = 8
+ALL_BRANCHES = frozenset(range(DEFAULT + 1))
+
+
+def decode_branches(features):
+    """Branches of the fetch_decode case statement taken: opcodes 0x0-0x7 and ``DEFAULT``."""
+    return {min(f % 16, DEFAULT) for f, _ in features if f < _EDGES}
+
+
+def branch_name(branch):
+    return "default" if branch == DEFAULT else OPCODE_NAMES[branch]
+
+
+def coverage_report(features):
+    """Summary of the global coverage ``features``."""
+    seen = {f for f, _ in features}
+    transitions = fsm_transitions(features)
+    missing = sorted(ALL_TRANSITIONS - transitions)
+    branches = decode_branches(features)
+    return {
+        "features": len(features),
+        "opcodes": sorted({f % 16 for f in seen if f < _EDGES}),
+        "opcode_pairs": sum(1 for f in seen if f < _EDGES),
+        "transitions": f"{len(transitions)}/{len(ALL_TRANSITIONS)}",
+        "missing_transitions": [f"{STATE_NAMES[a]}->{STATE_NAMES[b]}" for a, b in missing],
+        "branches": f"{len(branches)}/{len(ALL_BRANCHES)}",
+        "missing_branches": [branch_name(b) for b in sorted(ALL_BRANCHES - branches)],
+        "dp_wrap": [DP_WRAP_UP in seen, DP_WRAP_DOWN in seen],
+        "ip_wrap": IP_WRAP in seen,
+    }
+
+
+class Fuzzer:
+    """Coverage-guided generator of halting programs and starting tapes."""
+
+    def __init__(self, seed=None, length=48, tape_cells=32, max_cycles=1024):
+        self.rng = np.random.default_rng(seed)
+        self.length = length
+        self.tape_cells = tape_cells
+        self.max_cycles = max_cycles
+        self.corpus = []        # (rom, tape) pairs that added coverage
+        self.features = set()
+        self.generated = 0
+        self.halting = 0
+
+    def _random(self, n):
+        rng = self.rng
+        roms = np.zeros((n, CODE_SIZE), dtype=np.uint8)
+        roms[:, :self.length] = rng.choice(16, size=(n, self.length), p=_WEIGHTS)
+        # keep most jump targets inside the program
+        hadd = np.zeros_like(roms, dtype=bool)
+        hadd[:, 1:] = (roms[:, :-1] == JMP) | (roms[:, :-1] == JZ)
+        roms[hadd] = rng.integers(0, (self.length + 15) // 16, size=int(hadd.sum()))
+        # most programs end with a stop; the others may wrap around IP
+        ends = rng.integers(1, self.length + 1, size=n)
+        roms[np.arange(CODE_SIZE) >= ends[:, None]] = 0
+        stop = rng.random(n) < 0.9
+        roms[np.flatnonzero(stop), ends[stop] % CODE_SIZE] = HALT
+        tapes = np.zeros((n, TAPE_SIZE), dtype=bool)
+        tapes[:, :self.tape_cells] = rng.random((n, self.tape_cells)) < 0.5
+        return roms, tapes
+
+    def _mutate(self, n):
+        rng = self.rng
+        parents = rng.integers(0, len(self.corpus), size=n)
+        roms = np.stack([self.corpus[p][0] for p in parents])
+        tapes = np.stack([self.corpus[p][1] for p in parents])
+        flip = rng.random(roms.shape) < 2 / self.length
+        flip[:, self.length + 16:] = False
+        roms[flip] = rng.choice(16, size=int(flip.sum()), p=_WEIGHTS)
+        tapes ^= rng.random(tapes.shape) < 1 / self.tape_cells
+        return roms, tapes
+
+    def next_batch(self, n=256):
+        """Return ``(roms, tapes, batch, keep)``: a run ``CoverageBatch`` and the halting rows."""
+        if self.corpus:
+            m = n // 2
+            r1, t1 = self._random(n - m)
+            r2, t2 = self._mutate(m)
+            roms, tapes = np.concatenate((r1, r2)), np.concatenate((t1, t2))
+        else:
+            roms, tapes = self._random(n)
+        batch = CoverageBatch(roms, tapes).run(self.max_cycles)
+        keep = np.flatnonzero(batch.halted)
+        for i in keep:
+            new = batch.features(i) - self.features
+            if new:
+                self.features |= new
+                self.corpus.append((roms[i].copy(), tapes[i].copy()))
+        self.generated += n
+        self.halting += len(keep)
+        return roms, tapes, batch, keep
+
+
+async def shrink(rom, tape, fails, max_rounds=64):
+    """Smallest ``(rom, tape)`` found for which ``await fails(rom, tape)`` holds.
+
+    Greedily deletes nibbles, replaces them with nops and clears tape
+    cells, keeping every change after which the case still fails.
+    """
+    rom = [int(c) for c in rom]
+    tape = [int(b) for b in tape]
+    while rom and rom[-1] == NOP:
+        rom.pop()
+    while tape and not tape[-1]:
+        tape.pop()
+
+    for _ in range(max_rounds):
+        changed = False
+        i = len(rom) - 1
+        while i >= 0:
+            candidate = rom[:i] + rom[i + 1:]
+            if await fails(candidate, tape):
+                rom, changed = candidate, True
+            elif rom[i] != NOP:
+                candidate = rom[:i] + [NOP] + rom[i + 1:]
+                if await fails(candidate, tape):
+                    rom, changed = candidate, True
+            i -= 1
+        for j in range(len(tape) - 1, -1, -1):
+            if tape[j]:
+                candidate = tape[:j] + [0] + tape[j + 1:]
+                if await fails(rom, candidate):
+                    tape, changed = candidate, True
+        while rom and rom[-1] == NOP:
+            rom.pop()
+        while tape and not tape[-1]:
+            tape.pop()
+        if not changed:
+            break
+    return rom, tape
+
+
+def reproducer(rom, tape, note=""):
+    """EPM source of a failing case, with its tape and the expected result."""
+    expected = run_program(rom, tape)
+    lines = [f"; fuzzer reproducer{': ' + note if note else ''}",
+             f"; tape: {''.join(str(int(b)) for b in tape)}",
+             f"; model: halted={expected.halted} cycles={expected.cycles} "
+             f"IP=0x{expected.ip:02X} DP=0x{expected.dp:02X}"]
+    return "\n".join(lines) + "\n" + listing(bytearray(rom) + bytearray(CODE_SIZE - len(rom)))
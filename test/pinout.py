@@ -0,0 +1,75 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+#Masks definitions according to the pinout (see info.yaml):
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+#
+# Inputs:
+#   ui[0]: "OUT_CTRL0"
+#   ui[1]: "OUT_CTRL1"
+#   ui[2]: "OUT_CTRL2"
+#   ui[3]: "SPI_SCK"
+#   ui[4]: "SPI_MOSI"
+#   ui[5]: "SPI_CS"
+#   ui[6]: "RUN"
+#   ui[7]: "MODE"
+#
+# Outputs:
+#   uo[0..7]: "OUT8B0".."OUT8B7"
+#
+# Bidirectional pins as otputs:
+#   uio[0]: "STATE0"
+#   uio[1]: "STATE1"
+#   uio[2]: "STATE2"
+#   uio[3]: "STATE3"
+#   uio[4]: "OUT3B0"
+#   uio[5]: "OUT3B1"
+#   uio[6]: "OUT3B2"
+#   uio[7]: "SPI_MISO"
+
+MSK_SPI_SCK_TO_ON = 0x08
+MSK_SPI_SCK_TO_OFF = 0xF7
+MSK_SPI_MOSI_TO_ON = 0x10
+MSK_SPI_MOSI_TO_OFF = 0xEF
+MSK_SPI_CS_TO_ON = 0x20
+MSK_SPI_CS_TO_OFF = 0xDF
+MSK_RUN_TO_ON = 0x40
+MSK_RUN_TO_OFF = 0xBF
+MSK_MODE_TO_ON = 0x80
+MSK_MODE_TO_OFF = 0x7F
+
+# All the ui_in bits owned by the SPI master:
+MSK_SPI_BITS = MSK_SPI_SCK_TO_ON | MSK_SPI_MOSI_TO_ON | MSK_SPI_CS_TO_ON
+
+MSK_STATE = 0x0F
+MSK_OUT3B = 0x70
+MSK_SPI_MISO = 0x80
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+# OUT8b and OUT3B seting
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+#   +--------+-------------+--------------------+----------------+
+#   |out_ctrl|    OUT8B    |       OUT3B        |      Note      |
+#   +--------+-------------+--------------------+----------------+
+#   |   0    | spi2rom_add | spi2rom_din[2:0]   |                |
+#   +--------+-------------+--------------------+----------------+
+#   |   1    | spi2rom_add | spi2rom_dout[2:0]  |                |
+#   +--------+-------------+--------------------+----------------+
+#   |   2    | spi2ram_add |{2'b00,spi2rom_din} |                |
+#   +--------+-------------+--------------------+----------------+
+#   |   3    | spi2ram_add |{2'b00,spi2rom_dout}|                |
+#   +--------+-------------+--------------------+----------------+
+#   |   4    | cpu2rom_add | cpu2rom_dout[2:0]  |   OUT8B= IP    |
+#   +--------+-------------+--------------------+----------------+
+#   |   5    | cpu2rom_add | cpu2rom_dout[2:0]  |   OUT8B= IP    |
+#   +--------+-------------+--------------------+----------------+
+#   |   6    | cpu2ram_add |{2'b00,cpu2rom_din} |   OUT8B= DP    |
+#   +--------+-------------+--------------------+----------------+
+#   |   7    | cpu2ram_add |{2'b00,cpu2rom_dout}|   OUT8B= DP    |
+#   +--------+-------------+--------------------+----------------+
+
+MSK_OUT_CTRL_TO_0 = 0xF8
+MSK_OUT_CTRL_TO_4 = 0x04
+MSK_OUT_CTRL_TO_6 = 0x06
+MSK_OUT_CTRL = 0x07
@@ -0,0 +1,275 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Cycle accurate Python model of the Post_cpu FSMD (src/MPM_cpu.v).
+
+``PostCpuModel.step()`` follows the RTL one CLK edge at a time, including
+the look-ahead ``we``/``bit`` registers and the RAM write on the falling
+edge (mem_clk = ~CLK in execution mode). ``PostCpuModel.run()`` gives the
+same final state and cycle count by retiring a whole instruction per
+iteration, using the number of cycles each instruction spends in the FSM.
+
+Cycle counts are the number of CLK cycles with ``state_reg != stop``,
+from the edge that enters ``start`` to the edge that returns to ``stop``.
+
+``add_width`` follows the ADD_WIDTH parameter of Post_cpu: 2**add_width
+nibbles of code and cells of tape, and jump targets of
+``jump_nibbles(add_width)`` nibbles, which add one load_ha_jmp cycle per
+nibble beyond the two of the 8 bit build.
+"""
+
+from collections import namedtuple
+
+ADD_WIDTH = 8
+CODE_SIZE = 1 << ADD_WIDTH
+TAPE_SIZE = 1 << ADD_WIDTH
+
+# symbolic state declaration (uio_out[3:0])
+STOP = 0x0
+START = 0x1
+FETCH_DECODE = 0x2
+LOAD_HA_JMP = 0x3
+LOAD_LA_JMP = 0x4
+JMP_EXE = 0x5
+JZ_EXE = 0x6
+INCDP_EXE = 0x7
+DECDP_EXE = 0x8
+SET_EXE = 0x9
+CLR_EXE = 0xA
+
+STATE_NAMES = (
+    "stop", "start", "fetch_decode", "load_ha_jmp", "load_la_jmp",
+    "jmp_exe", "jz_exe", "incdp_exe", "decdp_exe", "set_exe", "clr_exe",
+)
+
+# symbolic opcode declaration
+NOP = 0x0
+INCDP = 0x1
+DECDP = 0x2
+SET = 0x3
+CLR = 0x4
+JMP = 0x5
+JZ = 0x6
+HALT = 0x7   # stop_code; opcodes 0x8-0xF also stop through the default branch
+
+OPCODE_NAMES = ("nop", "incdp", "decdp", "set", "clr", "jmp", "jz", "stop")
+
+# state entered from fetch_decode for each opcode
+_DECODE = (FETCH_DECODE, INCDP_EXE, DECDP_EXE, SET_EXE, CLR_EXE, LOAD_HA_JMP, JZ_EXE) + (STOP,) * 9
+
+# Cycles from fetch_decode back to fetch_decode (or stop) per instruction:
+CYCLES_NOP = 1
+CYCLES_EXE = 2          # incdp, decdp, set, clr
+CYCLES_JMP = 4          # fetch_decode, load_ha_jmp, load_la_jmp, jmp_exe
+CYCLES_JZ_TAKEN = 5     # fetch_decode, jz_exe, load_ha_jmp, load_la_jmp, jmp_exe
+CYCLES_JZ_SKIP = 2      # fetch_decode, jz_exe
+CYCLES_STOP = 1
+CYCLES_START = 1
+
+PostResult = namedtuple("PostResult", "halted cycles ip dp tape")
+
+
+def jump_nibbles(add_width=ADD_WIDTH):
+    """Nibbles of a jmp/jz target (hadd nibbles, then ladd)."""
+    return (add_width + 3) // 4
+
+
+class Tape:
+    """``size`` one bit cells packed eight per byte, like the my_ram sync_ram."""
+
+    __slots__ = ("buf", "size")
+
+    def __init__(self, bits=(), size=TAPE_SIZE):
+        self.size = size
+        self.buf = bytearray((size + 7) // 8)
+        for i, b in enumerate(bits):
+            if b:
+                self.buf[i >> 3] |= 1 << (i & 7)
+
+    def __getitem__(self, i):
+        return (self.buf[i >> 3] >> (i & 7)) & 1
+
+    def __setitem__(self, i, b):
+        if b:
+            self.buf[i >> 3] |= 1 << (i & 7)
+        else:
+            self.buf[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+    def __len__(self):
+        return self.size
+
+    def __eq__(self, other):
+        return isinstance(other, Tape) and self.buf == other.buf
+
+    def copy(self):
+        t = Tape(size=self.size)
+        t.buf[:] = self.buf
+        return t
+
+    def to_bits(self):
+        """Return the cells as a ``bytearray`` of 0/1 (256 entries in the 8 bit build)."""
+        return bytearray(self[i] for i in range(self.size))
+
+
+def rom_image(code, size=CODE_SIZE):
+    """Pad ``code`` (nibbles) to a ``size`` (256) nibble ``bytearray``."""
+    rom = bytearray(size)
+    if len(code) > size:
+        raise ValueError(f"program of {len(code)} nibbles does not fit the code space")
+    for i, nibble in enumerate(code):
+        if not 0 <= nibble <= 0xF:
+            raise ValueError(f"0x{nibble:X} at 0x{i:02X} is not a nibble")
+        rom[i] = nibble
+    return rom
+
+
+class PostCpuModel:
+    """Golden model of Post_cpu attached to its code (ROM) and data (tape) spaces."""
+
+    def __init__(self, rom=(), tape=(), add_width=ADD_WIDTH):
+        self.add_width = add_width
+        self.mask = (1 << add_width) - 1
+        self.nibbles = jump_nibbles(add_width)
+        self.rom = rom_image(rom, 1 << add_width)
+        self.tape = tape.copy() if isinstance(tape, Tape) else Tape(tape, 1 << add_width)
+        self.reset()
+
+    def reset(self):
+        self.state = STOP
+        self.ip = 0
+        self.dp = 0
+        self.instruction = 0
+        self.hadd = 0
+        self.ladd = 0
+        self.hcnt = 0
+        self.bit = 0
+        self.we = 0
+        self.cycles = 0
+
+    def step(self, run=False):
+        """Advance one CLK cycle; ``run`` is the pulse_generator output."""
+        state, ip, dp, mask = self.state, self.ip, self.dp, self.mask
+        code = self.rom[ip]
+        if state == STOP:
+            nxt = START if run else STOP
+        elif state == START:
+            ip, dp, nxt = 0, 0, FETCH_DECODE
+        elif state == FETCH_DECODE:
+            self.instruction = code
+            ip = (ip + 1) & mask
+            nxt = _DECODE[code]
+        elif state == LOAD_HA_JMP:
+            ip = (ip + 1) & mask
+            self.hadd = ((self.hadd << 4) | code) & ((1 << 4 * (self.nibbles - 1)) - 1)
+            if self.hcnt == self.nibbles - 2:
+                self.hcnt, nxt = 0, LOAD_LA_JMP
+            else:
+                self.hcnt, nxt = self.hcnt + 1, LOAD_HA_JMP
+        elif state == LOAD_LA_JMP:
+            self.ladd = code
+            nxt = JMP_EXE
+        elif state == JMP_EXE:
+            ip = ((self.hadd << 4) | self.ladd) & mask
+            nxt = FETCH_DECODE
+        elif state == JZ_EXE:
+            if self.tape[dp]:
+                ip = (ip + self.nibbles) & mask
+                nxt = FETCH_DECODE
+            else:
+                nxt = LOAD_HA_JMP
+        elif state == INCDP_EXE:
+            dp = (dp + 1) & mask
+            nxt = FETCH_DECODE
+        elif state == DECDP_EXE:
+            dp = (dp - 1) & mask
+            nxt = FETCH_DECODE
+        elif state in (SET_EXE, CLR_EXE):
+            nxt = FETCH_DECODE
+        else:
+            nxt = STOP
+
+        # look-ahead output logic
+        self.we = int(nxt in (SET_EXE, CLR_EXE))
+        self.bit = int(nxt == SET_EXE)
+        if nxt != STOP:
+            self.cycles += 1
+        self.state, self.ip, self.dp = nxt, ip, dp
+
+        # my_ram is clocked by ~CLK: the write lands half a cycle later
+        if self.we:
+            self.tape[dp] = self.bit
+
+    def _target(self, ip):
+        """Jump target of more than two nibbles starting at ``ip``; sets ``hadd``/``ladd``."""
+        rom, mask, hadd = self.rom, self.mask, 0
+        for k in range(self.nibbles - 1):
+            hadd = (hadd << 4) | rom[(ip + k) & mask]
+        self.hadd, self.ladd = hadd, rom[(ip + self.nibbles - 1) & mask]
+        return ((hadd << 4) | self.ladd) & mask
+
+    def run(self, max_cycles=1 << 20):
+        """Execute from ``start`` until ``stop`` or ``max_cycles`` are spent.
+
+        Returns a ``PostResult``; ``halted`` is False when the budget ran out
+        (the model is then left at an instruction boundary).
+        """
+        return self.resume(0, 0, CYCLES_START, max_cycles)
+
+    def resume(self, ip, dp, cycles, max_cycles=1 << 20):
+        """Like ``run()``, from the fetch of ``ip`` with ``cycles`` already spent."""
+        rom, tape, mask, skip = self.rom, self.tape, self.mask, self.nibbles
+        cycles_jmp = CYCLES_JMP + skip - 2
+        cycles_jz_taken = CYCLES_JZ_TAKEN + skip - 2
+        self.cycles = 0
+        while cycles < max_cycles:
+            code = rom[ip]
+            ip = (ip + 1) & mask
+            if code == NOP:
+                cycles += CYCLES_NOP
+            elif code == INCDP:
+                dp = (dp + 1) & mask
+                cycles += CYCLES_EXE
+            elif code == DECDP:
+                dp = (dp - 1) & mask
+                cycles += CYCLES_EXE
+            elif code == SET:
+                tape[dp] = 1
+                cycles += CYCLES_EXE
+            elif code == CLR:
+                tape[dp] = 0
+                cycles += CYCLES_EXE
+            elif code == JMP:
+                if skip == 2:
+                    self.hadd, self.ladd = rom[ip], rom[(ip + 1) & mask]
+                    ip = (self.hadd << 4) | self.ladd
+                else:
+                    ip = self._target(ip)
+                cycles += cycles_jmp
+            elif code == JZ:
+                if tape[dp]:
+                    ip = (ip + skip) & mask
+                    cycles += CYCLES_JZ_SKIP
+                elif skip == 2:
+                    self.hadd, self.ladd = rom[ip], rom[(ip + 1) & mask]
+                    ip = (self.hadd << 4) | self.ladd
+                    cycles += CYCLES_JZ_TAKEN
+                else:
+                    ip = self._target(ip)
+                    cycles += cycles_jz_taken
+            else:
+                self.instruction = code
+                self.ip, self.dp, self.state = ip, dp, STOP
+                self.cycles = cycles + CYCLES_STOP
+                self.we = self.bit = 0
+                return PostResult(True, self.cycles, ip, dp, tape.to_bits())
+            self.instruction = code
+
+        self.ip, self.dp, self.state = ip, dp, FETCH_DECODE
+        self.cycles = cycles
+        self.we = self.bit = 0
+        return PostResult(False, cycles, ip, dp, tape.to_bits())
+
+
+def run_program(rom, tape=(), max_cycles=1 << 20, add_width=ADD_WIDTH):
+    """Run ``rom`` on a fresh model and return its ``PostResult``."""
+    return PostCpuModel(rom, tape, add_width).run(max_cycles)
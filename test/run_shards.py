@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Run the cocotb suite split into shards, one make process per shard.
+
+The cocotb tests of MODULE and the EPM programs of the library (one
+generated ``test_program_<name>`` test each, see session.py) are dealt
+round-robin to the shards (cocotb TESTCASE, EPM_PROGRAMS). Every shard
+gets its own results file, merged into one results.xml at the end. With
+Icarus every shard also gets its own SIM_BUILD directory; with Verilator
+the model is built once (``make build``, in the cached build directory
+of the Makefile) and all shards run that binary. ``-k`` selects tests
+by name, ``test_program_<name>`` ones included.
+
+    ./run_shards.py -j 8                  # RTL
+    ./run_shards.py -j 8 --gates          # GATES=yes
+    ./run_shards.py --programs lib/*.epm  # shard a program library
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from session import program_test_name
+
+HERE = Path(__file__).resolve().parent
+
+
+def discover_tests(module_file):
+    """Names of the ``@cocotb.test()`` coroutines defined in ``module_file``."""
+    tree = ast.parse(Path(module_file).read_text())
+    names = []
+    for node in tree.body:
+        if not isinstance(node, ast.AsyncFunctionDef):
+            continue
+        for deco in node.decorator_list:
+            target = deco.func if isinstance(deco, ast.Call) else deco
+            if isinstance(target, ast.Attribute) and target.attr == "test":
+                names.append(node.name)
+                break
+    return names
+
+
+def plan_shards(tests, programs, jobs):
+    """Deal tests and programs round-robin; returns [(tests, programs)] without empty shards."""
+    items = [(test, None) for test in tests] + [(program_test_name(p), p) for p in programs]
+    shards = [([], []) for _ in range(max(1, jobs))]
+    for i, (test, program) in enumerate(items):
+        shards[i % len(shards)][0].append(test)
+        if program is not None:
+            shards[i % len(shards)][1].append(program)
+    return [s for s in shards if s[0]]
+
+
+def make_command(args, *words):
+    cmd = ["make", *words]
+    if args.sim:
+        cmd.append(f"SIM={args.sim}")
+    if args.gates:
+        cmd.append("GATES=yes")
+    return cmd + args.make_args
+
+
+def shared_build(args):
+    """Whether the shards share one build (Verilator, see the build cache in the Makefile)."""
+    return (args.sim or os.environ.get("SIM", "icarus")) == "verilator"
+
+
+def run_shard(index, tests, programs, args):
+    build = Path("sim_build") / f"{'gl' if args.gates else 'rtl'}_shard{index}"
+    results = build / "results.xml"
+    cmd = make_command(args, f"COCOTB_RESULTS_FILE={results}", f"TESTCASE={','.join(tests)}")
+    if not shared_build(args):
+        cmd.insert(1, f"SIM_BUILD={build}")
+        if args.rebuild:
+            cmd.append("-B")
+    env = dict(os.environ, EPM_PROGRAMS=os.pathsep.join(str(p) for p in programs))
+    (HERE / build).mkdir(parents=True, exist_ok=True)
+    (HERE / results).unlink(missing_ok=True)
+    start = time.monotonic()
+    with open(HERE / build / "make.log", "w") as log:
+        proc = subprocess.run(cmd, cwd=HERE, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return index, proc.returncode, HERE / results, time.monotonic() - start
+
+
+def merge_results(files, output):
+    """Merge cocotb results files into a single testsuite; return (tests, failures)."""
+    merged = ET.Element("testsuites", name="results")
+    suite = ET.SubElement(merged, "testsuite", name="all", package="all")
+    tests = failures = 0
+    for f in files:
+        for case in ET.parse(f).getroot().iter("testcase"):
+            suite.append(case)
+            tests += 1
+            failures += case.find("failure") is not None
+    ET.indent(merged)
+    ET.ElementTree(merged).write(output, encoding="UTF-8", xml_declaration=True)
+    return tests, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="number of shards")
+    parser.add_argument("--gates", action="store_true", help="gate level simulation (GATES=yes)")
+    parser.add_argument("--sim", help="simulator (default: the Makefile's SIM)")
+    parser.add_argument("--module", default="test", help="cocotb MODULE whose tests are sharded")
+    parser.add_argument("-k", "--testcase", action="append", help="only run these tests")
+    parser.add_argument("--programs", nargs="*", help="EPM programs to run, one test each "
+                        "(default: programs/*.epm)")
+    parser.add_argument("-o", "--output", default="results.xml", help="merged results file")
+    parser.add_argument("--rebuild", action="store_true", help="force make -B in every shard")
+    parser.add_argument("make_args", nargs="*", help="extra make variables, e.g. EXTRA_ARGS=...")
+    args = parser.parse_args(argv)
+
+    if args.programs is None:
+        library = sorted((HERE / "programs").glob("*.epm"))
+    else:
+        library = [Path(p).resolve() for p in args.programs]
+    if args.testcase:
+        # test_program_<name> tests only exist in a shard that runs their program
+        by_name = {program_test_name(p): p for p in library}
+        tests, programs = [], []
+        for name in args.testcase:
+            if name in by_name:
+                programs.append(by_name[name])
+            elif name.startswith("test_program_"):
+                parser.error(f"{name}: no such program in the library ({len(library)} programs)")
+            else:
+                tests.append(name)
+        if args.programs is not None:
+            programs += [p for p in library if p not in programs]
+    else:
+        tests, programs = discover_tests(HERE / f"{args.module}.py"), library
+    shards = plan_shards(tests, programs, args.jobs)
+
+    start = time.monotonic()
+    if shared_build(args):
+        cmd = make_command(args, "build") + (["-B"] if args.rebuild else [])
+        if subprocess.run(cmd, cwd=HERE).returncode:
+            print("build failed")
+            return 1
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        runs = list(pool.map(lambda s: run_shard(s[0], *s[1], args), enumerate(shards)))
+
+    written = []
+    for index, code, results, elapsed in runs:
+        status = "ok" if code == 0 and results.exists() else f"make exited with {code}"
+        print(f"shard {index}: {len(shards[index][0])} tests, {len(shards[index][1])} programs, "
+              f"{elapsed:.1f} s, {status}")
+        if results.exists():
+            written.append(results)
+        else:
+            print(f"  see {results.parent / 'make.log'}")
+
+    total, failures = merge_results(written, HERE / args.output)
+    print(f"{total} tests, {failures} failures, {len(shards)} shards, {time.monotonic() - start:.1f} s "
+          f"-> {args.output}")
+    return 1 if failures or len(written) != len(runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
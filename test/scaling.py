@@ -0,0 +1,120 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Memory size scaling study of the Post system (ADD_WIDTH of src/MPM_cpu.v).
+
+``make scaling`` builds the design with 8, 10 and 12 bit IP/DP
+(``SCALING_WIDTHS``) and runs ``test_memory_scaling`` on each build. The
+test runs ``FILL``, which sets every cell of the tape and stops when DP
+wraps around, so its cycles grow with the tape, and records:
+
+    cells               2**add_width
+    run_cycles          cycles to halt of FILL
+    run_wall_s          wall time of the run
+    spi_load_cycles     cycles to write the code and clear the whole tape through SPI
+    spi_load_wall_s     wall time of that load
+    backdoor_wall_s     one backdoor write of both memories and a read of the tape
+    model_wall_s        run_program of FILL on the Python model
+
+Each width adds its entry to the ``SCALING_RESULTS`` file under
+``<simulator>/aw<width>`` (``bench.merge_results``). ``scaling_table()``
+prints them with the growth of each quantity per doubling of the memory
+(2.0x is linear in the number of cells), and ``scaling_notes()`` points
+at what grows faster than the memory or gets slower per cycle::
+
+    python3 scaling.py scaling_results.json
+"""
+
+import json
+import math
+import sys
+from pathlib import Path
+
+FILL = """
+; Set every cell of the tape, then stop when DP wraps around to a set cell
+loop:   jz    mark
+        stop
+mark:   set
+        incdp
+        jmp   loop
+"""
+
+# Nibbles written through SPI for FILL: the program (11 nibbles at 12 bits) and a margin
+FILL_NIBBLES = 16
+
+COLUMNS = ("run_cycles", "run_wall_s", "spi_load_cycles", "spi_load_wall_s", "backdoor_wall_s", "model_wall_s")
+
+# Growth per doubling of the memory above which a quantity is flagged
+SUPERLINEAR = 2.2
+# Drop of the simulated kcycles per second from one width to the next that is flagged
+SLOWDOWN = 0.75
+# Wall times shorter than this are timer noise and not flagged
+MIN_WALL_S = 0.01
+
+
+def _widths(merged):
+    """{simulator: [(add_width, entry), ...]} sorted by width."""
+    series = {}
+    for key, entry in merged.items():
+        sim, _, width = key.partition("/aw")
+        series.setdefault(sim, []).append((int(width), entry))
+    return {sim: sorted(entries, key=lambda e: e[0]) for sim, entries in sorted(series.items())}
+
+
+def growth(small, large, key):
+    """Factor by which ``key`` grows per doubling of the cells from ``small`` to ``large``."""
+    doublings = math.log2(large["cells"] / small["cells"])
+    if not doublings or not small.get(key) or not large.get(key):
+        return None
+    return (large[key] / small[key]) ** (1 / doublings)
+
+
+def scaling_table(merged):
+    """Text table of a results file: one row per build, growth per doubling on the next rows."""
+    rows = [("build", "cells") + COLUMNS]
+    for sim, entries in _widths(merged).items():
+        previous = None
+        for width, entry in entries:
+            rows.append((f"{sim}/aw{width}", str(entry["cells"]))
+                        + tuple(f"{entry[c]:.3g}" if c in entry else "-" for c in COLUMNS))
+            if previous is not None:
+                factors = [growth(previous, entry, c) for c in COLUMNS]
+                rows.append(("  per doubling", "") + tuple(f"{f:.2f}x" if f else "-" for f in factors))
+            previous = entry
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip() for row in rows)
+
+
+def scaling_notes(merged):
+    """Quantities that grow faster than the memory, and simulators that slow down per cycle."""
+    notes = []
+    for sim, entries in _widths(merged).items():
+        for (w0, small), (w1, large) in zip(entries, entries[1:]):
+            for key in COLUMNS:
+                if key.endswith("_wall_s") and small.get(key, 0) < MIN_WALL_S:
+                    continue
+                factor = growth(small, large, key)
+                if factor and factor > SUPERLINEAR:
+                    notes.append(f"{sim}: {key} grows {factor:.2f}x per doubling from {w0} to {w1} bits")
+            for cycles, wall in (("run_cycles", "run_wall_s"), ("spi_load_cycles", "spi_load_wall_s")):
+                if small.get(wall) and large.get(wall):
+                    rate = (large[cycles] / large[wall]) / (small[cycles] / small[wall])
+                    if rate < SLOWDOWN:
+                        notes.append(f"{sim}: {cycles} simulated {rate:.2f}x as fast per cycle "
+                                     f"at {w1} bits as at {w0}")
+    return notes
+
+
+def main(argv=None):
+    """Print the table and notes of a results file (``SCALING_RESULTS``)."""
+    argv = sys.argv[1:] if argv is None else argv
+    path = Path(argv[0] if argv else "scaling_results.json")
+    merged = json.loads(path.read_text())
+    print(scaling_table(merged))
+    for note in scaling_notes(merged):
+        print(note)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
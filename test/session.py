@@ -0,0 +1,173 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Bring-up and run helpers shared by the tests, and ``PostSession``.
+
+cocotb runs every test of a module in one simulator process, but each
+test used to pay for its own reset and SPI bring-up. ``PostSession``
+keeps the SPI master and loader of the design across tests: the first
+test does the full bring-up, later tests only restart the clock and
+pulse ``rst_n`` before bulk-loading the next program with ``run()``.
+``run_batch()`` runs a whole batch of programs after one reset and
+returns NumPy arrays to compare with ``batch_model.PostBatch`` at once.
+One test per library program (``program_test_name``) gives separate
+results per program in results.xml.
+"""
+
+import re
+
+import cocotb
+import numpy as np
+from cocotb.clock import Clock
+from cocotb.result import SimTimeoutError
+from cocotb.triggers import ClockCycles, FallingEdge, ReadOnly
+
+from backdoor import BackdoorLoader
+from cpu_monitor import CpuMonitor
+from pinout import (MSK_MODE_TO_ON, MSK_OUT_CTRL_TO_4, MSK_OUT_CTRL_TO_6, MSK_RUN_TO_ON, MSK_SPI_BITS,
+                    MSK_STATE)
+from post_model import STOP, TAPE_SIZE, PostResult
+from spi_master import CS_GAP_CYCLES, PostSpiMaster
+
+CLK_PERIOD = 10
+CLK_UNITS = "us"
+
+
+def start_clock(dut):
+    # Set the clock period to 10 us (100 KHz)
+    clock = Clock(dut.clk, CLK_PERIOD, units=CLK_UNITS)
+    cocotb.start_soon(clock.start())
+
+
+async def reset(dut):
+    dut._log.info("Reset")
+    dut.ena.value = 1
+    dut.ui_in.value = 0
+    dut.uio_in.value = 0
+    dut.rst_n.value = 0
+    await ClockCycles(dut.clk, 2)
+    dut.rst_n.value = 1
+
+
+async def start_and_reset(dut):
+    start_clock(dut)
+    await reset(dut)
+
+
+async def execute(dut, timeout_cycles):
+    """Run the loaded program in execution mode and return (cycles, IP, DP).
+
+    Leaves the system back in programing mode (MODE=0).
+    """
+    dut.ui_in.value = MSK_MODE_TO_ON | MSK_OUT_CTRL_TO_4
+    await ClockCycles(dut.clk, 2)
+    monitor = CpuMonitor(dut, clk_period=CLK_PERIOD, units=CLK_UNITS).start()
+    try:
+        dut.ui_in.value = MSK_MODE_TO_ON | MSK_OUT_CTRL_TO_4 | MSK_RUN_TO_ON
+        await monitor.wait_halt(timeout_cycles)
+        await ReadOnly()
+        cycles, ip = monitor.run_cycles, int(dut.uo_out.value)
+    finally:
+        monitor.stop()
+
+    await FallingEdge(dut.clk)
+    dut.ui_in.value = MSK_MODE_TO_ON | MSK_OUT_CTRL_TO_6
+    await ClockCycles(dut.clk, 1)
+    await ReadOnly()
+    dp = int(dut.uo_out.value)
+    await FallingEdge(dut.clk)
+    dut.ui_in.value = 0
+    return cycles, ip, dp
+
+
+async def read_tape(loader):
+    if loader.available:
+        return loader.read_ram()
+    await loader.spi.idle()
+    return await loader.spi.dump_ram()
+
+
+def program_test_name(path):
+    """Name of the generated cocotb test that runs the program at ``path``."""
+    return "test_program_" + re.sub(r"\W", "_", path.stem)
+
+
+class PostSession:
+    """Design state kept across the tests of one simulator run."""
+
+    _current = None
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.spi = PostSpiMaster(dut, clk_period=CLK_PERIOD, units=CLK_UNITS)
+        self.loader = BackdoorLoader(dut, self.spi)
+        self.booted = False
+        self.runs = 0
+
+    @classmethod
+    async def attach(cls, dut):
+        """Session of ``dut``, ready to ``run()`` in the calling test."""
+        session = cls._current
+        if session is None or session.dut is not dut:
+            session = cls._current = cls(dut)
+        start_clock(dut)    # the clock of the previous test was killed with it
+        if session.booted:
+            await session.fast_reset()
+        else:
+            await reset(dut)
+            await session.spi.idle()
+            session.booted = True
+        return session
+
+    async def fast_reset(self):
+        """Pulse ``rst_n`` for one cycle with the SPI lines idle."""
+        dut = self.dut
+        await FallingEdge(dut.clk)
+        dut.ui_in.value = MSK_SPI_BITS
+        dut.rst_n.value = 0
+        await FallingEdge(dut.clk)
+        dut.rst_n.value = 1
+        await ClockCycles(dut.clk, CS_GAP_CYCLES)
+
+    async def run(self, rom, tape=(), timeout_cycles=1 << 16):
+        """Load ``rom``/``tape`` in bulk, run to ``stop`` and return a ``PostResult``.
+
+        A program that does not stop within ``timeout_cycles`` raises
+        ``SimTimeoutError``; the next ``fast_reset`` recovers the CPU.
+        """
+        loader = self.loader
+        if loader.available:
+            loader.write_rom(rom)
+            loader.write_ram(tape)
+        else:
+            await loader.load(rom, tape)
+        cycles, ip, dp = await execute(self.dut, timeout_cycles)
+        self.runs += 1
+        halted = int(self.dut.uio_out.value) & MSK_STATE == STOP
+        return PostResult(halted, cycles, ip, dp, await read_tape(loader))
+
+    async def run_batch(self, roms, tapes, timeout_cycles):
+        """``run()`` every row of ``roms``/``tapes`` after one ``fast_reset``.
+
+        ``timeout_cycles`` holds one budget per row. Returns the arrays
+        ``(halted, cycles, ip, dp, tape)`` in the layout of ``PostBatch``; a
+        program that times out is left not halted and the CPU is reset
+        before the next one.
+        """
+        n = len(roms)
+        halted = np.zeros(n, dtype=bool)
+        cycles = np.zeros(n, dtype=np.int64)
+        ip = np.zeros(n, dtype=np.int64)
+        dp = np.zeros(n, dtype=np.int64)
+        tape = np.zeros((n, TAPE_SIZE), dtype=bool)
+        await self.fast_reset()
+        for i in range(n):
+            rom, cells = np.asarray(roms[i], dtype=np.uint8), np.asarray(tapes[i], dtype=np.uint8)
+            try:
+                result = await self.run(rom.tolist(), cells.tolist(), int(timeout_cycles[i]))
+            except SimTimeoutError:
+                await self.fast_reset()
+                continue
+            halted[i], cycles[i], ip[i], dp[i] = result[:4]
+            tape[i] = np.frombuffer(bytes(result.tape), dtype=np.uint8)[:TAPE_SIZE] != 0
+        return halted, cycles, ip, dp, tape
@@ -0,0 +1,128 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Windowed hashes of the outputs of ``tb`` for gate level sign-off.
+
+``OutputSignature`` wakes up on changes of ``uo_out`` and ``uio_out``
+and keeps, for every CLK cycle, the value the outputs settle to (gate
+level glitches inside a cycle are dropped). Every ``window`` cycles it
+folds the (cycle, uo_out, uio_out) changes of the window into a rolling
+hash, chained to the hash of the previous window::
+
+    hash[k] = blake2b(hash[k-1], cycle, uo_out, uio_out, ... of window k)
+
+The values are hashed as ``binstr``, so X and Z show up as differences.
+An RTL run saves the hashes with ``save()``; a gate level run of the
+same stimulus is started with them as ``reference`` and ``diverged``
+fires at the end of the first window whose hash differs, so the test
+can stop there and report the cycles of that window. Only that window
+then needs a waveform dump (``WaveDump.window``)::
+
+    make signature                              # RTL: signatures/<program>.json
+    make gl-check                               # GL: stop at the first window that differs
+    make -B gl-check DUMP=1 DUMP_PAUSED=1 SIGNATURE_DUMP_WINDOW=<k>
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import cocotb
+from cocotb.triggers import Edge, Event, First, RisingEdge
+from cocotb.utils import get_sim_steps, get_sim_time
+
+WINDOW_CYCLES = 1024
+DIGEST_SIZE = 8
+
+
+class OutputSignature:
+    """Per-window hashes of ``uo_out``/``uio_out`` of ``tb`` from ``start()``.
+
+    ``clk_period``/``units`` must match the cocotb Clock driving ``dut.clk``.
+    """
+
+    def __init__(self, dut, window=WINDOW_CYCLES, clk_period=10, units="us", reference=None):
+        self.dut = dut
+        self.window = window
+        self.clk_period = clk_period
+        self.units = units
+        self.reference = reference
+        self._period_steps = get_sim_steps(clk_period, units)
+        self.hashes = []
+        self.cycles = 0
+        self.mismatch = None
+        self.diverged = Event()
+        self._task = None
+
+    def _value(self):
+        return (self.dut.uo_out.value.binstr + self.dut.uio_out.value.binstr).encode()
+
+    def _cycle(self):
+        return (get_sim_time() - self._t0) // self._period_steps
+
+    async def start(self):
+        """Start hashing at the next rising CLK edge (cycle 0)."""
+        await RisingEdge(self.dut.clk)
+        self._t0 = get_sim_time()
+        self._digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        self._last = None
+        self._pending = (0, self._value())
+        self._task = cocotb.start_soon(self._watch())
+        return self
+
+    async def _watch(self):
+        changes = First(Edge(self.dut.uo_out), Edge(self.dut.uio_out))
+        while True:
+            await changes
+            cycle, value = self._cycle(), self._value()
+            if cycle > self._pending[0]:
+                self._commit(*self._pending)
+            self._pending = (cycle, value)
+
+    def _commit(self, cycle, value):
+        """Add the settled ``value`` of ``cycle``, closing the windows before it."""
+        while cycle >= (len(self.hashes) + 1) * self.window:
+            self._close()
+        if value != self._last:
+            self._digest.update(cycle.to_bytes(4, "little") + value)
+            self._last = value
+
+    def _close(self):
+        k = len(self.hashes)
+        self.hashes.append(self._digest.hexdigest())
+        self._digest = hashlib.blake2b(self._digest.digest(), digest_size=DIGEST_SIZE)
+        if self.reference is not None and self.mismatch is None:
+            if k >= len(self.reference) or self.reference[k] != self.hashes[k]:
+                self.mismatch = k
+                self.diverged.set()
+
+    def stop(self):
+        """Stop and close the windows up to now, the last one possibly partial."""
+        self._task.kill()
+        self.cycles = self._cycle()
+        self._commit(*self._pending)
+        while len(self.hashes) * self.window < self.cycles:
+            self._close()
+        if self.reference is not None and self.mismatch is None and len(self.hashes) != len(self.reference):
+            self.mismatch = min(len(self.hashes), len(self.reference))
+            self.diverged.set()
+        return self.hashes
+
+    def span(self, k):
+        """Cycles [start, stop) of window ``k``."""
+        return k * self.window, (k + 1) * self.window
+
+    def to_dict(self):
+        return {"window": self.window, "clk_period": self.clk_period, "units": self.units,
+                "cycles": self.cycles, "hashes": self.hashes}
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+        return path
+
+
+def load_signature(path):
+    """Dict saved by ``OutputSignature.save()``."""
+    return json.loads(Path(path).read_text())
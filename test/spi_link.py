@@ -0,0 +1,253 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Client side of the Post system link: framed batches of SPI words and pin commands.
+
+Host tools talk to ``SpiServer`` (spi_server.py), which runs them on the
+simulated ``tt_um_galaguna_PostSys``, over TCP (``host:port``) or a Unix
+socket (a path). The client runs without a simulator, so the same
+``Batch`` could be sent to a bridge to the real chip.
+
+Every message is a frame: a little endian u32 length and the payload.
+A request payload is a sequence of commands, each one an opcode byte
+and its arguments::
+
+    SPI         0x01  n (u16), capture (u8), n words (u16)  ->  n MISO words (u16)
+    PINS        0x02  ui_in (u8): RUN, MODE, OUT_CTRL; the SPI bits are ignored
+    WAIT        0x03  cycles (u32)
+    READ        0x04                                        ->  uo_out, uio_out (u8)
+    WAIT_HALT   0x05  timeout cycles (u32)                  ->  run cycles to the next stop (u32)
+    RESET       0x06
+
+and the reply payload is a status byte followed by the results of the
+commands in order (OK), or by a UTF-8 message (ERROR, the rest of the
+batch is not run). ``capture`` is the number of low MISO bits sampled
+per word. A batch costs one round trip however many words it carries,
+so ``PostLink.write_block()``, ``read_block()`` and ``run()`` are one
+round trip each::
+
+    with PostLink("localhost:5555") as link:
+        link.write_block(ROM_BASE, rom)
+        halted, cycles, ip, dp = link.run(timeout_cycles=100000)
+        tape = link.dump_ram()
+
+``python spi_link.py localhost:5555 prog.epm`` loads an EPM program and
+its tape, runs it and prints the result.
+"""
+
+import argparse
+import json
+import socket
+import struct
+
+from pinout import MSK_MODE_TO_ON, MSK_OUT_CTRL_TO_4, MSK_OUT_CTRL_TO_6, MSK_RUN_TO_ON, MSK_STATE
+from post_model import STOP
+from spi_master import RAM_BASE, RAM_SIZE, ROM_BASE, ROM_SIZE, STUFF_WORD, command_word, is_rom_addr
+
+OP_SPI = 0x01
+OP_PINS = 0x02
+OP_WAIT = 0x03
+OP_READ = 0x04
+OP_WAIT_HALT = 0x05
+OP_RESET = 0x06
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+LENGTH = struct.Struct("<I")
+MAX_WORDS = 0xFFFF
+
+
+class LinkError(RuntimeError):
+    """A batch failed on the server; the message says why."""
+
+
+def parse_address(address):
+    """(family, address) of ``host:port`` (TCP) or of a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return socket.AF_INET, (host or "localhost", int(port))
+    return socket.AF_UNIX, address
+
+
+def send_frame(sock, payload):
+    sock.sendall(LENGTH.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock, n):
+    data = bytearray()
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def recv_frame(sock):
+    """Payload of the next frame, or None when the peer closed the connection."""
+    header = _recv_exactly(sock, LENGTH.size)
+    if header is None:
+        return None
+    (length,) = LENGTH.unpack(header)
+    payload = _recv_exactly(sock, length)
+    if payload is None:
+        raise ConnectionError("connection closed in the middle of a frame")
+    return payload
+
+
+class Batch:
+    """Commands sent in one frame; ``decode`` splits the reply into their results."""
+
+    def __init__(self):
+        self._parts = []
+        self._results = []      # (struct format, count) of each command with a result
+
+    def spi(self, words, capture=16):
+        words = list(words)
+        if len(words) > MAX_WORDS:
+            raise ValueError(f"{len(words)} SPI words do not fit a command (max {MAX_WORDS})")
+        self._parts.append(struct.pack(f"<BHB{len(words)}H", OP_SPI, len(words), capture, *words))
+        self._results.append(("H", len(words)))
+        return self
+
+    def pins(self, ui_in):
+        self._parts.append(struct.pack("<BB", OP_PINS, ui_in))
+        return self
+
+    def wait(self, cycles):
+        self._parts.append(struct.pack("<BI", OP_WAIT, cycles))
+        return self
+
+    def read(self):
+        self._parts.append(struct.pack("<B", OP_READ))
+        self._results.append(("BB", None))
+        return self
+
+    def wait_halt(self, timeout_cycles):
+        self._parts.append(struct.pack("<BI", OP_WAIT_HALT, timeout_cycles))
+        self._results.append(("I", None))
+        return self
+
+    def reset(self):
+        self._parts.append(struct.pack("<B", OP_RESET))
+        return self
+
+    def encode(self):
+        return b"".join(self._parts)
+
+    def decode(self, reply):
+        """Results of the commands: a list of words per SPI, a tuple per READ, an int per WAIT_HALT."""
+        if reply[0] != STATUS_OK:
+            raise LinkError(reply[1:].decode(errors="replace"))
+        results, offset = [], 1
+        for fmt, count in self._results:
+            layout = struct.Struct("<" + (f"{count}{fmt}" if count is not None else fmt))
+            values = layout.unpack_from(reply, offset)
+            offset += layout.size
+            results.append(list(values) if count is not None else values if len(values) > 1 else values[0])
+        return results
+
+
+class PostLink:
+    """Connection to a ``SpiServer``, with the operations of ``PostSpiMaster``."""
+
+    def __init__(self, address, timeout=60.0):
+        family, target = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(target)
+        self.round_trips = 0
+        self.words = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.sock.close()
+
+    def execute(self, batch):
+        """Send ``batch`` and return its results (``Batch.decode``)."""
+        send_frame(self.sock, batch.encode())
+        reply = recv_frame(self.sock)
+        if reply is None:
+            raise ConnectionError("server closed the connection")
+        self.round_trips += 1
+        return batch.decode(reply)
+
+    def transfer_many(self, words):
+        self.words += len(words)
+        return self.execute(Batch().spi(words))[0]
+
+    def write_block(self, addr, values):
+        words = [command_word(addr + i, v) for i, v in enumerate(values)]
+        self.words += len(words)
+        self.execute(Batch().spi(words, capture=0))
+
+    def read_block(self, addr, count):
+        words = []
+        for i in range(count):
+            words += [command_word(addr + i, read=True), STUFF_WORD]
+        bits = 4 if is_rom_addr(addr) else 1
+        self.words += len(words)
+        replies = self.execute(Batch().spi(words, capture=bits))[0]
+        return replies[1::2]
+
+    def write(self, addr, value):
+        self.write_block(addr, [value])
+
+    def read(self, addr):
+        return self.read_block(addr, 1)[0]
+
+    def dump_rom(self):
+        return bytearray(self.read_block(ROM_BASE, ROM_SIZE))
+
+    def dump_ram(self):
+        return bytearray(self.read_block(RAM_BASE, RAM_SIZE))
+
+    def reset(self):
+        self.execute(Batch().reset())
+
+    def run(self, timeout_cycles=1 << 16):
+        """Run the loaded program to ``stop``: (halted, cycles, IP, DP), back in programing mode.
+
+        ``cycles`` are the cycles out of ``stop``, as ``execute()`` counts them;
+        a program that does not stop in ``timeout_cycles`` raises ``LinkError``.
+        """
+        batch = (Batch()
+                 .pins(MSK_MODE_TO_ON | MSK_OUT_CTRL_TO_4).wait(2)
+                 .pins(MSK_MODE_TO_ON | MSK_OUT_CTRL_TO_4 | MSK_RUN_TO_ON)
+                 .wait_halt(timeout_cycles)
+                 .read()
+                 .pins(MSK_MODE_TO_ON | MSK_OUT_CTRL_TO_6).wait(1)
+                 .read()
+                 .pins(0))
+        cycles, (ip, uio_out), (dp, _) = self.execute(batch)
+        return uio_out & MSK_STATE == STOP, cycles, ip, dp
+
+
+def main(argv=None):
+    from epm_asm import assemble, source_tape
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("address", help="host:port or Unix socket path of the server")
+    parser.add_argument("program", help="EPM source file")
+    parser.add_argument("--timeout", type=int, default=1 << 20, help="run timeout in cycles")
+    args = parser.parse_args(argv)
+    with open(args.program) as f:
+        source = f.read()
+    rom, tape = assemble(source), source_tape(source)
+    with PostLink(args.address) as link:
+        link.write_block(ROM_BASE, rom)
+        link.write_block(RAM_BASE, list(tape) + [0] * (RAM_SIZE - len(tape)))
+        halted, cycles, ip, dp = link.run(args.timeout)
+        ram = link.dump_ram()
+        print(json.dumps({"halted": halted, "cycles": cycles, "ip": ip, "dp": dp,
+                          "tape": "".join(map(str, ram)), "round_trips": link.round_trips}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Master side of the slave_spi4post interface (src/post_spi.v).
+
+    |-------------------------------|
+    |         2 Bytes SPI word      |
+    |-------------------------------|
+    | RW  |  Address  |     Data    |
+    | bit |   bits    |     bits    |
+    |-----|-----------|-------------|
+    | b15 | [b14:b04] |  [b03:b00]  |
+    |-----|-----------|-------------|
+
+SPI 11 bits address map: CPU ROM at 0x000-0x0FF, CPU RAM at 0x400-0x4FF.
+``AddressMap(add_width)`` gives the map and word length of a build with a
+wider ADD_WIDTH (src/post_spi.v): {RW, RAM, address, data} words of 16
+bits up to 10 bit addresses, then add_width + 6 bits.
+
+The master keeps a shadow copy of ui_in and waits with Timer triggers
+aligned to the falling edge of CLK, so every SCK half period costs one
+write and one await (plus one MISO read for the reply bits that are wanted).
+Transfers that sample no reply bits (writes) are compiled into a
+``Waveform`` in one NumPy pass and played back instead (spi_waveform.py);
+``load_images()`` reuses the cached waveform of the same images.
+
+Reads cannot be pipelined: after a read command the slave shifts the
+data out during the next word and ignores MOSI until CS rises again
+(wait_low_o/wait_high_o), so a stuff word that carries the next read
+command is dropped (see ``test_spi_back_to_back_reads``). ``dump_rom()``
+and ``dump_ram()`` stream the command/stuff pairs in a single transfer
+and only sample the data bits of each reply.
+"""
+
+from cocotb.triggers import FallingEdge, Timer
+
+from pinout import MSK_SPI_BITS, MSK_SPI_CS_TO_ON, MSK_SPI_MOSI_TO_ON, MSK_SPI_SCK_TO_ON
+from post_model import ADD_WIDTH
+from spi_waveform import CS_GAP_CYCLES, MIN_SCK_DIV, compile_words, image_waveform, play
+
+ROM_BASE = 0x000
+ROM_SIZE = 0x100
+RAM_BASE = 0x400
+RAM_SIZE = 0x100
+
+READ_FLAG = 0x8000
+STUFF_WORD = 0xFFFF
+
+
+class AddressMap:
+    """SPI address map and word layout of a build with ``add_width`` bit IP/DP."""
+
+    def __init__(self, add_width=ADD_WIDTH):
+        self.add_width = add_width
+        self.word_bits = max(16, add_width + 6)
+        self.rom_base = 0
+        self.ram_base = 1 << (self.word_bits - 6)
+        self.rom_size = self.ram_size = 1 << add_width
+        self.read_flag = 1 << (self.word_bits - 1)
+        self.stuff_word = (1 << self.word_bits) - 1
+
+    def is_rom_addr(self, addr):
+        return self.rom_base <= addr < self.rom_base + self.rom_size
+
+    def is_ram_addr(self, addr):
+        return self.ram_base <= addr < self.ram_base + self.ram_size
+
+    def command_word(self, addr, data=0, read=False):
+        """Build the SPI command for ``addr`` of the SPI address map."""
+        if self.is_rom_addr(addr):
+            limit = 0xF
+        elif self.is_ram_addr(addr):
+            limit = 0x1
+        else:
+            raise ValueError(f"SPI address 0x{addr:03X} is outside CPU ROM and CPU RAM")
+        if not 0 <= data <= limit:
+            raise ValueError(f"data 0x{data:X} does not fit location 0x{addr:03X}")
+        return (self.read_flag if read else 0) | (addr << 4) | data
+
+
+# The Tiny Tapeout build (ADD_WIDTH=8)
+DEFAULT_MAP = AddressMap()
+
+
+def is_rom_addr(addr):
+    return DEFAULT_MAP.is_rom_addr(addr)
+
+
+def is_ram_addr(addr):
+    return DEFAULT_MAP.is_ram_addr(addr)
+
+
+def command_word(addr, data=0, read=False):
+    """Build the 16 bit SPI command for ``addr`` of the SPI address map."""
+    return DEFAULT_MAP.command_word(addr, data, read)
+
+
+class PostSpiMaster:
+    """SPI master for the Post system, driving ui_in[5:3] and sampling uio_out[7].
+
+    ``clk_period``/``units`` must match the cocotb Clock driving ``dut.clk``;
+    ``sck_div`` is the SCK period in CLK cycles (even, at least 8);
+    ``address_map`` is the ``AddressMap`` of the build.
+    """
+
+    def __init__(self, dut, clk_period=10, units="us", sck_div=MIN_SCK_DIV, address_map=DEFAULT_MAP):
+        self.dut = dut
+        self.clk_period = clk_period
+        self.units = units
+        self.sck_div = sck_div
+        self.map = address_map
+
+    @property
+    def sck_div(self):
+        return self._sck_div
+
+    @sck_div.setter
+    def sck_div(self, div):
+        if div < MIN_SCK_DIV or div % 2:
+            raise ValueError(f"SCK divider must be even and >= {MIN_SCK_DIV}, got {div}")
+        self._sck_div = div
+
+    def _cycles(self, n):
+        return Timer(n * self.clk_period, units=self.units)
+
+    async def idle(self, cycles=16):
+        """Drive CS, SCK and MOSI to their idle (high) levels."""
+        await FallingEdge(self.dut.clk)
+        self.dut.ui_in.value = int(self.dut.ui_in.value) | MSK_SPI_BITS
+        await self._cycles(cycles)
+
+    async def _transfer(self, words, capture):
+        """Send ``words`` and return the replies.
+
+        ``capture`` is the number of low reply bits sampled during each
+        word (0-16, up to ``word_bits``), or a sequence with one count per word.
+        """
+        if isinstance(capture, int):
+            capture = [capture] * len(words)
+        if not any(capture):
+            await self.play(compile_words(words, self.map.word_bits, self._sck_div))
+            return [0] * len(words)
+        dut = self.dut
+        await FallingEdge(dut.clk)
+        base = int(dut.ui_in.value) & ~MSK_SPI_BITS & 0xFF
+        idle = base | MSK_SPI_BITS
+        selected = base | MSK_SPI_SCK_TO_ON | MSK_SPI_MOSI_TO_ON
+        # ui_in values for SCK low/high indexed by the MOSI bit (CS low):
+        sck_low = (base, base | MSK_SPI_MOSI_TO_ON)
+        sck_high = (base | MSK_SPI_SCK_TO_ON, base | MSK_SPI_SCK_TO_ON | MSK_SPI_MOSI_TO_ON)
+        setup = self._cycles(1)
+        half = self._cycles(self._sck_div // 2)
+        gap = self._cycles(CS_GAP_CYCLES)
+        top = self.map.word_bits - 1
+
+        replies = []
+        for word, bits in zip(words, capture):
+            dut.ui_in.value = selected
+            await setup
+            miso = 0
+            for shift in range(top, -1, -1):
+                bit = (word >> shift) & 1
+                dut.ui_in.value = sck_low[bit]
+                await half
+                if shift < bits:
+                    miso = (miso << 1) | (dut.uio_out.value.binstr[0] == "1")
+                dut.ui_in.value = sck_high[bit]
+                await half
+            dut.ui_in.value = idle
+            await gap
+            replies.append(miso)
+        return replies
+
+    async def play(self, waveform):
+        """Drive a ``Waveform`` of spi_waveform.py (no MISO sampling)."""
+        await play(self.dut, waveform, self.clk_period, self.units)
+
+    async def load_images(self, rom=None, ram=None):
+        """Write whole ``rom``/``ram`` images from their base through the cached waveform of the load."""
+        await self.play(image_waveform(self.map, rom, ram, self._sck_div))
+
+    async def transfer_many(self, words, capture=16):
+        """Send words back to back and return the low ``capture`` bits read on MISO."""
+        return await self._transfer(words, capture)
+
+    async def write(self, addr, value):
+        await self._transfer([self.map.command_word(addr, value)], capture=0)
+
+    async def read(self, addr):
+        return (await self.read_block(addr, 1))[0]
+
+    async def write_block(self, addr, values):
+        """Write ``values`` to consecutive locations starting at ``addr``."""
+        words = [self.map.command_word(addr + i, v) for i, v in enumerate(values)]
+        await self._transfer(words, capture=0)
+
+    async def read_block(self, addr, count):
+        """Read ``count`` consecutive locations starting at ``addr``."""
+        words = []
+        for i in range(count):
+            words += [self.map.command_word(addr + i, read=True), self.map.stuff_word]
+        bits = 4 if self.map.is_rom_addr(addr) else 1
+        replies = await self._transfer(words, capture=[0, bits] * count)
+        return replies[1::2]
+
+    async def dump_rom(self):
+        """Whole CPU ROM, one nibble per byte."""
+        return bytearray(await self.read_block(self.map.rom_base, self.map.rom_size))
+
+    async def dump_ram(self):
+        """Whole CPU RAM (the tape), one bit per byte."""
+        return bytearray(await self.read_block(self.map.ram_base, self.map.ram_size))
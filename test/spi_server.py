@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Serve the simulated Post system to host tools as a remote SPI device.
+
+``SpiServer`` listens on TCP (``host:port``) or on a Unix socket (a path)
+and runs the batches of spi_link.py against ``tt_um_galaguna_PostSys``:
+SPI words go through the ``PostSpiMaster`` of a ``PostSession``, PINS
+drives RUN/MODE/OUT_CTRL at a falling CLK edge, WAIT_HALT waits on a
+``CpuMonitor`` started for that command only. The socket calls block the simulator, so simulated time
+only moves while a batch runs::
+
+    make serve SPI_SERVER=localhost:5555        # then connect a PostLink
+"""
+
+import os
+import socket
+import struct
+
+from cocotb.result import SimTimeoutError
+from cocotb.triggers import ClockCycles, FallingEdge, ReadOnly
+
+from cpu_monitor import CpuMonitor
+from pinout import MSK_SPI_BITS
+from session import CLK_PERIOD, CLK_UNITS
+from spi_link import (OP_PINS, OP_READ, OP_RESET, OP_SPI, OP_WAIT, OP_WAIT_HALT, STATUS_ERROR, STATUS_OK,
+                      parse_address, recv_frame, send_frame)
+
+
+class SpiServer:
+    """Run the batches of ``PostLink`` clients on the design of ``session``."""
+
+    def __init__(self, session, address, accept_timeout=60.0):
+        self.session = session
+        self.dut = session.dut
+        self.address = address
+        self.accept_timeout = accept_timeout
+        self.batches = 0
+        self.words = 0
+        self._sock = None
+
+    def listen(self):
+        """Bind the socket; clients can connect from then on."""
+        family, target = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(target):
+            os.unlink(target)
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        if family != socket.AF_UNIX:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(target)
+        self._sock.listen(1)
+        self._sock.settimeout(self.accept_timeout)
+        return self
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            family, target = parse_address(self.address)
+            if family == socket.AF_UNIX and os.path.exists(target):
+                os.unlink(target)
+
+    async def serve(self, clients=1):
+        """Serve ``clients`` connections one after the other, each until it closes."""
+        if self._sock is None:
+            self.listen()
+        try:
+            for _ in range(clients):
+                conn, _ = self._sock.accept()
+                with conn:
+                    conn.settimeout(None)
+                    while True:
+                        payload = recv_frame(conn)
+                        if payload is None:
+                            break
+                        send_frame(conn, await self.execute(payload))
+        finally:
+            self.close()
+
+    async def execute(self, payload):
+        """Reply payload of the request ``payload``."""
+        reply = bytearray([STATUS_OK])
+        try:
+            offset = 0
+            while offset < len(payload):
+                offset = await self._command(payload, offset, reply)
+        except (ValueError, IndexError, struct.error, SimTimeoutError) as error:
+            return bytes([STATUS_ERROR]) + f"{type(error).__name__}: {error}".encode()
+        self.batches += 1
+        return bytes(reply)
+
+    async def _command(self, payload, offset, reply):
+        """Run the command at ``offset``, add its result to ``reply``; offset of the next one."""
+        dut = self.dut
+        op = payload[offset]
+        offset += 1
+        if op == OP_SPI:
+            count, capture = struct.unpack_from("<HB", payload, offset)
+            offset += 3
+            words = struct.unpack_from(f"<{count}H", payload, offset)
+            offset += 2 * count
+            replies = await self.session.spi.transfer_many(words, capture)
+            reply += struct.pack(f"<{count}H", *replies)
+            self.words += count
+        elif op == OP_PINS:
+            await FallingEdge(dut.clk)
+            spi_bits = int(dut.ui_in.value) & MSK_SPI_BITS
+            dut.ui_in.value = spi_bits | (payload[offset] & ~MSK_SPI_BITS & 0xFF)
+            offset += 1
+        elif op == OP_WAIT:
+            (cycles,) = struct.unpack_from("<I", payload, offset)
+            offset += 4
+            if cycles:
+                await ClockCycles(dut.clk, cycles)
+        elif op == OP_READ:
+            await ReadOnly()
+            reply += bytes([int(dut.uo_out.value), int(dut.uio_out.value)])
+        elif op == OP_WAIT_HALT:
+            (timeout,) = struct.unpack_from("<I", payload, offset)
+            offset += 4
+            monitor = CpuMonitor(dut, clk_period=CLK_PERIOD, units=CLK_UNITS).start()
+            try:
+                await monitor.wait_halt(timeout)
+                reply += struct.pack("<I", monitor.run_cycles)
+            finally:
+                monitor.stop()
+        elif op == OP_RESET:
+            await self.session.fast_reset()
+        else:
+            raise ValueError(f"unknown command 0x{op:02X} at offset {offset - 1}")
+        return offset
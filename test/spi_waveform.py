@@ -0,0 +1,247 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Precomputed ``ui_in`` waveforms of SPI writes to slave_spi4post.
+
+``compile_words(words)`` turns a whole transfer into its ``ui_in`` SPI
+bits in one NumPy pass, with the timing of ``PostSpiMaster``: for each
+word CS goes low with SCK and MOSI high for one CLK, then every bit is
+put on MOSI MSB first with SCK low and then high for ``sck_div/2`` CLKs
+each, and CS stays high for ``CS_GAP_CYCLES``. A ``Waveform`` keeps it
+run-length encoded (``values``, ``cycles``); ``samples()`` expands it to
+one value per CLK cycle and ``words()`` gives the ``$readmemh`` words of
+tb_replay.v, ``{half_periods[22:0], rst_n, ui_in[7:0]}``.
+
+``play(dut, waveform)`` applies it from the next falling CLK edge with
+one write and one await per run and no other Python per bit;
+``PostSpiMaster`` plays every transfer that samples no MISO bits. The
+cocotb Clock still costs two callbacks per CLK cycle, so a load in a
+cocotb test is only somewhat faster; replayed by tb_replay.v, which
+drives its own clock, it runs without Python at all.
+
+``image_waveform(address_map, rom, ram)`` compiles the load of whole
+ROM/RAM images and keeps its words in ``.wave_cache/<hash>.mem`` (or
+``$WAVE_CACHE_DIR``), keyed by the images, the word layout and the
+divider. ``load_outputs()`` gives the ``uo_out``/``uio_out`` such a load
+leaves with SPI idle and OUT_CTRL=0. ``save_stim()`` puts a waveform
+after a reset into a tb_replay.v stimulus, so the same load replays
+natively::
+
+    python3 spi_waveform.py benchmarks/unary_add.epm -o recordings/unary_add_load.stim
+    make REPLAY=recordings/unary_add_load.stim
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from cocotb.triggers import FallingEdge, Timer
+
+from pinout import MSK_SPI_BITS, MSK_SPI_MOSI_TO_ON, MSK_SPI_SCK_TO_ON
+from post_model import STOP
+
+# f_sck = clk/8 is the fastest SCK documented in post_spi.v:
+MIN_SCK_DIV = 8
+# After the 16th SCK rising edge the slave spends 5 CLKs in
+# doit/ini_*/*_clk/read_*|write_* before it looks at CS again:
+CS_GAP_CYCLES = 8
+
+# Words of tb_replay.v: {half_periods[22:0], rst_n, ui_in[7:0]}
+COUNT_SHIFT = 9
+RST_N = 0x100
+
+WAVE_VERSION = 1
+DEFAULT_CACHE_DIR = Path(os.environ.get("WAVE_CACHE_DIR", Path(__file__).parent / ".wave_cache"))
+# Compiled image loads kept in memory by ``image_waveform``
+MEMORY_CACHE_SIZE = 32
+
+_compiled = {}
+
+
+class Waveform:
+    """``ui_in`` SPI bits of a transfer: ``values[i]`` for ``cycles[i]`` CLK cycles."""
+
+    __slots__ = ("values", "cycles")
+
+    def __init__(self, values, cycles):
+        self.values = np.asarray(values, dtype=np.uint8)
+        self.cycles = np.asarray(cycles, dtype=np.uint32)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def total_cycles(self):
+        return int(self.cycles.sum())
+
+    def samples(self):
+        """One ``ui_in`` value per CLK cycle."""
+        return np.repeat(self.values, self.cycles)
+
+    def words(self):
+        return ((2 * self.cycles) << COUNT_SHIFT) | RST_N | self.values
+
+    def save(self, path):
+        """Write ``words()`` as a ``$readmemh`` file."""
+        path = Path(path)
+        path.write_text("".join(f"{w:08x}\n" for w in self.words().tolist()))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        words = np.array([int(w, 16) for w in Path(path).read_text().split()], dtype=np.uint32)
+        return cls(words & 0xFF, (words >> COUNT_SHIFT) // 2)
+
+
+def compile_words(words, word_bits=16, sck_div=MIN_SCK_DIV):
+    """``Waveform`` of sending ``words`` back to back, ``word_bits`` each."""
+    words = np.asarray(words, dtype=np.uint32).reshape(-1)
+    half = sck_div // 2
+    # Runs of each word: select, (SCK low, SCK high) per bit, CS gap
+    bits = (words[:, None] >> np.arange(word_bits - 1, -1, -1, dtype=np.uint32)) & 1
+    mosi = bits.astype(np.uint8) * MSK_SPI_MOSI_TO_ON
+    values = np.empty((len(words), 2 * word_bits + 2), dtype=np.uint8)
+    values[:, 0] = MSK_SPI_SCK_TO_ON | MSK_SPI_MOSI_TO_ON
+    values[:, 1:-1:2] = mosi
+    values[:, 2:-1:2] = mosi | MSK_SPI_SCK_TO_ON
+    values[:, -1] = MSK_SPI_BITS
+    cycles = np.full(2 * word_bits + 2, half, dtype=np.uint32)
+    cycles[0], cycles[-1] = 1, CS_GAP_CYCLES
+    return Waveform(values.reshape(-1), np.tile(cycles, len(words)))
+
+
+def image_words(address_map, rom=None, ram=None):
+    """SPI write commands of the ``rom`` (nibbles) and ``ram`` (bits) images, ROM first."""
+    parts = []
+    for image, base, size, limit in ((rom, address_map.rom_base, address_map.rom_size, 0xF),
+                                     (ram, address_map.ram_base, address_map.ram_size, 0x1)):
+        if image is None:
+            continue
+        cells = np.frombuffer(bytes(image), dtype=np.uint8).astype(np.uint32)
+        if len(cells) > size:
+            raise ValueError(f"image of {len(cells)} cells does not fit {size} locations")
+        if len(cells) and cells.max() > limit:
+            raise ValueError(f"cell value 0x{int(cells.max()):X} out of range")
+        parts.append(((np.arange(len(cells), dtype=np.uint32) + base) << 4) | cells)
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint32)
+
+
+def load_outputs(address_map, rom=None, ram=None):
+    """``uo_out``/``uio_out`` binstrs after the ``image_words`` writes, from reset.
+
+    With OUT_CTRL=0 ``uo_out`` is spi2rom_add and OUT3B spi2rom_din[2:0],
+    both set by the last ROM write; MISO keeps bit 0 of the word before
+    the last one (the 16th bit shifted out of SRo) and the CPU stays in
+    ``stop`` in programming mode.
+    """
+    words = image_words(address_map, rom, ram).tolist()
+    rom_words = [w for w in words if address_map.is_rom_addr(w >> 4)]
+    last_rom = rom_words[-1] if rom_words else 0
+    miso = words[-2] & 1 if len(words) > 1 else 0
+    uio_out = (miso << 7) | ((last_rom & 0x7) << 4) | STOP
+    return {"uo_out": f"{(last_rom >> 4) & 0xFF:08b}", "uio_out": f"{uio_out:08b}"}
+
+
+def image_key(address_map, rom=None, ram=None, sck_div=MIN_SCK_DIV):
+    header = (f"spi-wave {WAVE_VERSION} {address_map.word_bits} {address_map.rom_base} "
+              f"{address_map.ram_base} {sck_div} {CS_GAP_CYCLES}")
+    digest = hashlib.sha256(header.encode())
+    for image in (rom, ram):
+        digest.update(b"-" if image is None else b"+%d:" % len(image) + bytes(image))
+    return digest.hexdigest()
+
+
+def image_waveform(address_map, rom=None, ram=None, sck_div=MIN_SCK_DIV, cache_dir=None):
+    """Cached ``Waveform`` writing the ``rom``/``ram`` images through SPI."""
+    key = image_key(address_map, rom, ram, sck_div)
+    waveform = _compiled.get(key)
+    if waveform is not None:
+        return waveform
+    cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+    path = cache_dir / f"{key}.mem"
+    try:
+        waveform = Waveform.load(path)
+    except (OSError, ValueError):
+        waveform = compile_words(image_words(address_map, rom, ram), address_map.word_bits, sck_div)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = waveform.save(path.with_suffix(f".{os.getpid()}.tmp"))
+        os.replace(tmp, path)
+    if len(_compiled) >= MEMORY_CACHE_SIZE:
+        _compiled.pop(next(iter(_compiled)))
+    _compiled[key] = waveform
+    return waveform
+
+
+async def play(dut, waveform, clk_period=10, units="us"):
+    """Drive ``waveform`` on the SPI bits of ``ui_in`` from the next falling CLK edge.
+
+    The other ``ui_in`` bits keep the value they have at that edge.
+    """
+    await FallingEdge(dut.clk)
+    base = int(dut.ui_in.value) & ~MSK_SPI_BITS & 0xFF
+    values = (waveform.values | base).tolist()
+    cycles = waveform.cycles.tolist()
+    timers = {c: Timer(c * clk_period, units=units) for c in set(cycles)}
+    ui_in = dut.ui_in
+    for value, c in zip(values, cycles):
+        ui_in.value = value
+        await timers[c]
+
+
+def stim_words(waveform, idle_cycles=16, tail_cycles=16):
+    """tb_replay.v words: the reset of ``session.reset``, SPI idle, ``waveform``, SPI idle."""
+    idle = RST_N | MSK_SPI_BITS
+    prefix = [4 << COUNT_SHIFT, (1 << COUNT_SHIFT) | RST_N, ((2 * idle_cycles) << COUNT_SHIFT) | idle]
+    return prefix + waveform.words().tolist() + [((2 * tail_cycles) << COUNT_SHIFT) | idle]
+
+
+def save_stim(path, waveform, final, clk_period=10, units="us"):
+    """Write ``waveform`` as ``path``.stim/.json for ``make REPLAY=``.
+
+    ``final`` is in the shape of ``stimulus.snapshot``: ``uo_out`` and
+    ``uio_out``, plus the ``rom``/``ram`` images the replay compares only
+    where it has the backdoor (RTL).
+    """
+    words = stim_words(waveform)
+    # Values of {rst_n, ui_in}; as in stimulus.py the initial value counts as a change
+    values = [w & ((1 << COUNT_SHIFT) - 1) for w in words]
+    changes = sum(1 for i, value in enumerate(values) if i == 0 or value != values[i - 1])
+    path = Path(path).with_suffix(".stim")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(f"{w:08x}\n" for w in words + [0]))
+    meta = {
+        "clk_period": clk_period,
+        "units": units,
+        "half_periods": sum(w >> COUNT_SHIFT for w in words),
+        "words": len(words),
+        "changes": changes,
+        "final": final,
+    }
+    path.with_suffix(".json").write_text(json.dumps(meta, indent=2) + "\n")
+    return path
+
+
+def main(argv=None):
+    from epm_asm import assemble_file, source_tape
+    from spi_master import DEFAULT_MAP
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("program", help="EPM source file")
+    parser.add_argument("-o", "--output", required=True, help="stimulus file for make REPLAY=")
+    parser.add_argument("--sck-div", type=int, default=MIN_SCK_DIV, help="SCK period in CLK cycles")
+    args = parser.parse_args(argv)
+    rom = assemble_file(args.program)
+    ram = bytearray(DEFAULT_MAP.ram_size)
+    tape = source_tape(Path(args.program).read_text())
+    ram[:len(tape)] = bytes(tape)
+    waveform = image_waveform(DEFAULT_MAP, rom, ram, args.sck_div)
+    final = dict(load_outputs(DEFAULT_MAP, rom, ram), rom=rom.hex(), ram=ram.hex())
+    path = save_stim(args.output, waveform, final)
+    print(f"{path}: {len(waveform)} runs, {waveform.total_cycles} cycles")
+
+
+if __name__ == "__main__":
+    main()
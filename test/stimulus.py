@@ -0,0 +1,153 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Record the ``ui_in``/``rst_n`` stimulus of a test for native replay.
+
+``StimulusRecorder`` wakes up on changes of ``ui_in`` and ``rst_n`` and
+keeps them on a grid of half CLK periods. ``save()`` writes a ``.stim``
+file for tb_replay.v, run-length encoded as one ``$readmemh`` word per
+run of constant inputs::
+
+    {half_periods[22:0], rst_n, ui_in[7:0]}     ended by 00000000
+
+and a ``.json`` file with the outputs and memory images at the end of
+the test, which replay.py checks after tb_replay.v has played the file
+back without Python in the loop (``make REPLAY=recordings/test_project.stim``).
+
+Only tests that drive the design through its pins can be replayed:
+backdoor writes are not part of the stimulus. Both the recorder and the
+replay clear ROM and RAM at their start so that they begin from the same
+memory contents.
+"""
+
+import json
+from pathlib import Path
+
+import cocotb
+from cocotb.triggers import Edge, FallingEdge, ReadOnly
+from cocotb.utils import get_sim_steps, get_sim_time
+
+from backdoor import BackdoorLoader
+from spi_waveform import COUNT_SHIFT
+
+MAX_COUNT = (1 << (32 - COUNT_SHIFT)) - 1
+
+
+def encode(changes, end):
+    """RLE words for ``changes`` [(half period, value)] lasting until half period ``end``."""
+    words = []
+    for (start, value), (stop, _) in zip(changes, changes[1:] + [(end, None)]):
+        count = stop - start
+        while count > 0:
+            run = min(count, MAX_COUNT)
+            words.append((run << COUNT_SHIFT) | value)
+            count -= run
+    return words
+
+
+def decode(words):
+    """Inverse of ``encode``: [(half periods, rst_n, ui_in)] up to the end word."""
+    runs = []
+    for word in words:
+        count = word >> COUNT_SHIFT
+        if not count:
+            break
+        runs.append((count, (word >> 8) & 1, word & 0xFF))
+    return runs
+
+
+def read_stimulus(path):
+    path = Path(path)
+    words = [int(line, 16) for line in path.read_text().split()]
+    return decode(words), json.loads(path.with_suffix(".json").read_text())
+
+
+async def snapshot(dut, loader):
+    """Outputs and (RTL only) memory images to compare after a replay."""
+    await ReadOnly()
+    final = {"uo_out": dut.uo_out.value.binstr, "uio_out": dut.uio_out.value.binstr}
+    if loader.available:
+        final["rom"] = loader.read_rom().hex()
+        final["ram"] = loader.read_ram().hex()
+    return final
+
+
+class StimulusRecorder:
+    """Record the pin stimulus of ``tb`` from the current time.
+
+    Start it in the same time step as the cocotb Clock (``start_clock``),
+    so that the recording begins on a rising CLK edge. When ``enabled`` is
+    false every method is a no-op.
+    """
+
+    def __init__(self, dut, clk_period=10, units="us", enabled=True):
+        self.dut = dut
+        self.clk_period = clk_period
+        self.units = units
+        self.enabled = enabled
+        self._half_steps = get_sim_steps(clk_period, units) // 2
+        self._tasks = []
+        self._changes = []
+
+    def _value(self):
+        dut = self.dut
+        rst_n = dut.rst_n.value
+        ui_in = dut.ui_in.value
+        rst_n = int(rst_n) if rst_n.is_resolvable else 0
+        ui_in = int(ui_in) if ui_in.is_resolvable else 0
+        return (rst_n << 8) | ui_in
+
+    def _now(self):
+        steps = get_sim_time() - self._t0
+        half, rest = divmod(steps, self._half_steps)
+        if rest:
+            raise ValueError(f"stimulus change {steps} steps after the start is not on a CLK edge")
+        return half
+
+    def start(self):
+        if not self.enabled:
+            return self
+        # Memory contents are not stimulus: start from cleared images, like replay.py
+        loader = BackdoorLoader(self.dut)
+        if loader.available:
+            loader.write_rom([])
+            loader.write_ram([])
+        self._t0 = get_sim_time()
+        self._changes = [(0, self._value())]
+        self._tasks = [cocotb.start_soon(self._watch(s)) for s in (self.dut.ui_in, self.dut.rst_n)]
+        return self
+
+    async def _watch(self, signal):
+        change = Edge(signal)
+        while True:
+            await change
+            half, value = self._now(), self._value()
+            if self._changes[-1][0] == half:
+                self._changes[-1] = (half, value)
+            elif self._changes[-1][1] != value:
+                self._changes.append((half, value))
+
+    async def save(self, path):
+        """Stop at the next falling CLK edge and write ``path``.stim/.json."""
+        if not self.enabled:
+            return None
+        await FallingEdge(self.dut.clk)
+        end = self._now()
+        for task in self._tasks:
+            task.kill()
+        final = await snapshot(self.dut, BackdoorLoader(self.dut))
+        words = encode(self._changes, end)
+
+        path = Path(path).with_suffix(".stim")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("".join(f"{w:08x}\n" for w in words + [0]))
+        meta = {
+            "clk_period": self.clk_period,
+            "units": self.units,
+            "half_periods": end,
+            "words": len(words),
+            "changes": len(self._changes),
+            "final": final,
+        }
+        path.with_suffix(".json").write_text(json.dumps(meta, indent=2) + "\n")
+        return path
@@ -6,13 +6,35 @@
 */
 module tb ();
 
-  // Dump the signals to a VCD file. You can view it with gtkwave or surfer.
+  // Waveform dumping is off unless built with `make DUMP=1` (see Makefile).
+  // The dump goes to tb.fst (tb.vcd with DUMP_FORMAT=vcd) and covers
+  // DUMP_SCOPE only. Test code pauses/resumes it through dump_on (waves.py).
+`ifdef DUMP
+`ifndef DUMP_SCOPE
+`define DUMP_SCOPE tb
+`endif
+`ifdef DUMP_PAUSED
+  reg dump_on = 1'b0;
+`else
+  reg dump_on = 1'b1;
+`endif
+
   initial begin
+`ifdef DUMP_VCD
     $dumpfile("tb.vcd");
-    $dumpvars(0, tb);
+`else
+    $dumpfile("tb.fst");
+`endif
+    $dumpvars(0, `DUMP_SCOPE);
+    if (!dump_on) $dumpoff;
     #1;
   end
 
+  always @(dump_on)
+    if (dump_on) $dumpon;
+    else $dumpoff;
+`endif
+
   // Wire up the inputs and outputs:
   reg clk;
   reg rst_n;
@@ -0,0 +1,85 @@
+`default_nettype none
+`timescale 1ns / 1ps
+
+/* Replay variant of tb.v (make REPLAY=<file>.stim, see stimulus.py).
+   The clock and the ui_in/rst_n stimulus recorded from a test are played
+   back from the file given by +stim=<file> (+stim_words=<lines in it>);
+   replay.py only waits for replay_done and checks the final outputs.
+*/
+module tb ();
+
+`ifndef STIM_DEPTH
+`define STIM_DEPTH 65536
+`endif
+
+  // Half CLK period in ns (the tests run CLK at 100 KHz)
+  parameter HALF_PERIOD = 5000;
+
+  // Wire up the inputs and outputs:
+  reg clk;
+  reg rst_n;
+  reg ena;
+  reg [7:0] ui_in;
+  reg [7:0] uio_in;
+  wire [7:0] uo_out;
+  wire [7:0] uio_out;
+  wire [7:0] uio_oe;
+`ifdef GL_TEST
+  wire VPWR = 1'b1;
+  wire VGND = 1'b0;
+`endif
+
+  // Replace tt_um_example with your module name:
+  tt_um_galaguna_PostSys user_project (
+
+      // Include power ports for the Gate Level test:
+`ifdef GL_TEST
+      .VPWR(VPWR),
+      .VGND(VGND),
+`endif
+
+      .ui_in  (ui_in),    // Dedicated inputs
+      .uo_out (uo_out),   // Dedicated outputs
+      .uio_in (uio_in),   // IOs: Input path
+      .uio_out(uio_out),  // IOs: Output path
+      .uio_oe (uio_oe),   // IOs: Enable path (active high: 0=input, 1=output)
+      .ena    (ena),      // enable - goes high when design is selected
+      .clk    (clk),      // clock
+      .rst_n  (rst_n)     // not reset
+  );
+
+  // One word per run of constant inputs: {half periods[22:0], rst_n, ui_in[7:0]},
+  // ended by a word with a zero count.
+  reg [31:0] stim [0:`STIM_DEPTH-1];
+  reg replay_done = 1'b0;
+  reg [8*1024-1:0] stim_file;
+  integer stim_words;
+  integer entry;
+  integer half;
+
+  initial begin
+    if (!$value$plusargs("stim=%s", stim_file)) begin
+      $display("tb_replay: no +stim=<file> given");
+      $finish;
+    end
+    if (!$value$plusargs("stim_words=%d", stim_words))
+      stim_words = `STIM_DEPTH;
+    if (stim_words > `STIM_DEPTH) begin
+      $display("tb_replay: %0d stimulus words, rebuild with -DSTIM_DEPTH=%0d", stim_words, stim_words);
+      $finish;
+    end
+    $readmemh(stim_file, stim, 0, stim_words - 1);
+    ena = 1'b1;
+    uio_in = 8'h00;
+    clk = 1'b1;         // like cocotb's Clock, start on a rising edge
+    for (entry = 0; stim[entry][31:9] != 0; entry = entry + 1) begin
+      // Non-blocking, so that the flops clocked by this edge see the old inputs
+      // as they do when cocotb writes the inputs after the edge.
+      {rst_n, ui_in} <= stim[entry][8:0];
+      for (half = 0; half < stim[entry][31:9]; half = half + 1)
+        #(HALF_PERIOD) clk = ~clk;
+    end
+    replay_done = 1'b1;
+  end
+
+endmodule
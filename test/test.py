@@ -1,116 +1,86 @@
 # SPDX-FileCopyrightText: © 2024 Tiny Tapeout
 # SPDX-License-Identifier: Apache-2.0
 
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
 import cocotb
-from cocotb.clock import Clock
-from cocotb.triggers import ClockCycles
+from cocotb.result import SimTimeoutError
+from cocotb.triggers import ClockCycles, FallingEdge, First, ReadOnly
+from cocotb.utils import get_sim_time
+
+from backdoor import BackdoorLoader
+from bench import (BENCH_DIR, benchmark_files, compare, compare_simulators, load_baseline, merge_results,
+                   suite_throughput, update_baseline)
+from cpu_monitor import CpuMonitor
+from cpu_profiler import CpuWatcher, Profile, run_model
+from cpu_trace import HEADER, CpuTracer, Trace, open_trace, trace_program
+from epm_asm import assemble, assemble_cached, listing, source_tape
+from fast_model import fast_run_program
+from fuzz import ALL_TRANSITIONS, Fuzzer, coverage_report, reproducer, shrink
+from pinout import (MSK_MODE_TO_ON, MSK_OUT3B, MSK_OUT_CTRL_TO_4, MSK_OUT_CTRL_TO_6, MSK_RUN_TO_OFF,
+                    MSK_RUN_TO_ON, MSK_STATE)
+from post_model import ADD_WIDTH, FETCH_DECODE, JMP_EXE, START, STOP, run_program
+from scaling import FILL, FILL_NIBBLES, scaling_table
+from session import (PostSession, execute, program_test_name, read_tape, reset, start_and_reset,
+                     start_clock)
+from signature import WINDOW_CYCLES, OutputSignature, load_signature
+from spi_link import Batch, LinkError, PostLink
+from spi_master import RAM_BASE, ROM_BASE, STUFF_WORD, AddressMap, PostSpiMaster, command_word
+from spi_server import SpiServer
+from spi_waveform import image_waveform, image_words, load_outputs
+from stimulus import StimulusRecorder, snapshot
+from waves import WaveDump
+
+PROGRAMS_DIR = Path(__file__).parent / "programs"
+
+UNARY_INCREMENT = """
+loop:   jz    done
+        incdp
+        jmp   loop
+        nop
+done:   set
+        stop
+"""
+
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR")
+TRACE_DIR = os.environ.get("TRACE_DIR")
+STIM_RECORD_DIR = os.environ.get("STIM_RECORD_DIR")
+# Gate level run (make GATES=yes): no backdoor, every load goes through SPI
+# on the netlist, so the long workloads only run at RTL.
+GATES = os.environ.get("GATES") == "yes"
+
+
+def program_files():
+    """EPM programs to run: $EPM_PROGRAMS (os.pathsep separated) or programs/*.epm."""
+    listed = os.environ.get("EPM_PROGRAMS")
+    if listed is not None:
+        return [Path(p) for p in listed.split(os.pathsep) if p]
+    return sorted(PROGRAMS_DIR.glob("*.epm"))
 
 
 @cocotb.test()
 async def test_project(dut):
     dut._log.info("Start")
-
-    # Set the clock period to 10 us (100 KHz)
-    clock = Clock(dut.clk, 10, units="us")
-    cocotb.start_soon(clock.start())
-
-    # Reset
-    dut._log.info("Reset")
-    dut.ena.value = 1
-    dut.ui_in.value = 0
-    dut.uio_in.value = 0
-    dut.rst_n.value = 0
-    await ClockCycles(dut.clk, 2)
-    dut.rst_n.value = 1
+    start_clock(dut)
+    recorder = StimulusRecorder(dut, enabled=bool(STIM_RECORD_DIR)).start()
+    await reset(dut)
 
     dut._log.info("Test project behavior")
 
-    #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-    #Masks definitions according to the pinout:
-    #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-    #
-    # Inputs:
-    #   ui[0]: "OUT_CTRL0"
-    #   ui[1]: "OUT_CTRL1"
-    #   ui[2]: "OUT_CTRL2"
-    #   ui[3]: "SPI_SCK"
-    #   ui[4]: "SPI_MOSI"
-    #   ui[5]: "SPI_CS"
-    #   ui[6]: "RUN"
-    #   ui[7]: "MODE"
-    #
-    # Outputs:
-    #   uo[0]: "OUT8B0"
-    #   uo[1]: "OUT8B1"
-    #   uo[2]: "OUT8B2"
-    #   uo[3]: "OUT8B3"
-    #   uo[4]: "OUT8B4"
-    #   uo[5]: "OUT8B5"
-    #   uo[6]: "OUT8B6"
-    #   uo[7]: "OUT8B7"
-    #
-    # Bidirectional pins as otputs:
-    #   uio[0]: "STATE0"
-    #   uio[1]: "STATE1"
-    #   uio[2]: "STATE2"
-    #   uio[3]: "STATE3"
-    #   uio[4]: "OUT3B0"
-    #   uio[5]: "OUT3B1"
-    #   uio[6]: "OUT3B2"
-    #   uio[7]: "SPI_MISO"
-
-    MSK_SPI_SCK_TO_ON = 0x08
-    MSK_SPI_SCK_TO_OFF = 0xF7
-    MSK_SPI_MOSI_TO_ON = 0x10
-    MSK_SPI_MOSI_TO_OFF = 0xEF
-    MSK_SPI_CS_TO_ON = 0x20
-    MSK_SPI_CS_TO_OFF = 0xDF
-    MSK_RUN_TO_ON = 0x40
-    MSK_RUN_TO_OFF = 0xBF
-    MSK_MODE_TO_ON = 0x80
-    MSK_MODE_TO_OFF = 0x7F
-    MSK_OUT3B = 0x70
-    MSK_STATE = 0x0F
-
-    #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-    # OUT8b and OUT3B seting
-    #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-    #   +--------+-------------+--------------------+----------------+
-    #   |out_ctrl|    OUT8B    |       OUT3B        |      Note      |
-    #   +--------+-------------+--------------------+----------------+
-    #   |   0    | spi2rom_add | spi2rom_din[2:0]   |                |
-    #   +--------+-------------+--------------------+----------------+
-    #   |   1    | spi2rom_add | spi2rom_dout[2:0]  |                |
-    #   +--------+-------------+--------------------+----------------+
-    #   |   2    | spi2ram_add |{2'b00,spi2rom_din} |                |
-    #   +--------+-------------+--------------------+----------------+
-    #   |   3    | spi2ram_add |{2'b00,spi2rom_dout}|                |
-    #   +--------+-------------+--------------------+----------------+
-    #   |   4    | cpu2rom_add | cpu2rom_dout[2:0]  |   OUT8B= IP    |
-    #   +--------+-------------+--------------------+----------------+
-    #   |   5    | cpu2rom_add | cpu2rom_dout[2:0]  |   OUT8B= IP    |
-    #   +--------+-------------+--------------------+----------------+
-    #   |   6    | cpu2ram_add |{2'b00,cpu2rom_din} |   OUT8B= DP    |
-    #   +--------+-------------+--------------------+----------------+
-    #   |   7    | cpu2ram_add |{2'b00,cpu2rom_dout}|   OUT8B= DP    |
-    #   +--------+-------------+--------------------+----------------+
-
-    MSK_OUT_CTRL_TO_0 = 0xF8
-    MSK_OUT_CTRL_TO_4 = 0x04
-
-    #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-    #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-
-
     #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # Programing mode (MODE=0) with OUT_CTRL=0 (OUT8B = spi2rom_add, OUT3B=spi2rom_din[2:0])
     #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
-    #Master SPI initial values:  
-    dut.ui_in.value  = MSK_SPI_SCK_TO_ON | MSK_SPI_CS_TO_ON | MSK_SPI_MOSI_TO_ON
-    await ClockCycles(dut.clk, 16)
+    #Master SPI initial values:
+    spi = PostSpiMaster(dut, clk_period=10, units="us")
+    await spi.idle()
 
     #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # Sequence of ROM write SPI commands to store Post intructions
@@ -154,173 +124,7 @@ async def test_project(dut):
     # Write STOP intruction (0x7) in loc 0x00 of CPU space code
     # SPI command word: 0000000000000111 
     #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-       #SCK period #1:
-    dut.ui_in.value = dut.ui_in.value &   MSK_SPI_CS_TO_OFF  &   MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-    
-    #SCK period #2:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #3:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #4:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #5:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #6:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #7:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #8:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #9:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #10:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #11:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #12:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #13:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #14:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_MOSI_TO_ON
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #15:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_MOSI_TO_ON
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #16:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_MOSI_TO_ON
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    ###Last SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    #Master SPI final values:
-    dut.ui_in.value = MSK_SPI_CS_TO_ON  | MSK_SPI_MOSI_TO_ON | MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
+    await spi.write(0x000, 0x7)
     await ClockCycles(dut.clk, 16)
 
     expected_c_add = 0x00
@@ -332,173 +136,7 @@ async def test_project(dut):
     # Write NOP intruction (0x0) in loc 0x01 of CPU space code
     # SPI command word: 0000000000010000 
     #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-       #SCK period #1:
-    dut.ui_in.value = dut.ui_in.value &   MSK_SPI_CS_TO_OFF  &   MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-    
-    #SCK period #2:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #3:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #4:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #5:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #6:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #7:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #8:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #9:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #10:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #11:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #12:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_MOSI_TO_ON
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #13:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #14:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #15:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    #SCK period #16:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_MOSI_TO_OFF
-    await ClockCycles(dut.clk, 1)
-    ###SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    ###SCK rising edge:
-    dut.ui_in.value = dut.ui_in.value |  MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
-    ###Last SCK falling edge:
-    dut.ui_in.value = dut.ui_in.value &  MSK_SPI_SCK_TO_OFF
-    await ClockCycles(dut.clk, 4)
-    #Master SPI final values:
-    dut.ui_in.value = MSK_SPI_CS_TO_ON  | MSK_SPI_MOSI_TO_ON | MSK_SPI_SCK_TO_ON
-    await ClockCycles(dut.clk, 4)
-
+    await spi.write(0x001, 0x0)
     await ClockCycles(dut.clk, 16)
 
     expected_c_add = 0x01
@@ -519,10 +157,10 @@ async def test_project(dut):
     # Run the coded program (Just the STOP instruction)
     #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+    monitor = CpuMonitor(dut, clk_period=10, units="us").start()
     dut.ui_in.value = dut.ui_in.value | MSK_RUN_TO_ON
-    while((dut.uio_out.value & MSK_STATE) == 0):
-        await ClockCycles(dut.clk, 1)
-
+    await monitor.wait_state(START, timeout_cycles=16)
+    await ReadOnly()
 
     expected_state = 0x1 #Start state
     assert (dut.uio_out.value & MSK_STATE) == expected_state
@@ -531,9 +169,624 @@ async def test_project(dut):
     expected_op_code = 0x7 #Programmed STOP code
     assert (dut.uio_out.value & MSK_OUT3B)>>4 == expected_op_code
 
+    await FallingEdge(dut.clk)
     dut.ui_in.value = dut.ui_in.value &  MSK_RUN_TO_OFF
-    while((dut.uio_out.value & MSK_STATE) != 0):
-        await ClockCycles(dut.clk, 1)
+    await monitor.wait_halt(timeout_cycles=16)
+    await ReadOnly()
 
     expected_c_add = 0x01   #Next IP
     assert dut.uo_out.value == expected_c_add
+    await recorder.save(Path(STIM_RECORD_DIR or ".") / "test_project")
+
+
+@cocotb.test()
+async def test_spi_master(dut):
+    dut._log.info("Start")
+    start_clock(dut)
+    recorder = StimulusRecorder(dut, enabled=bool(STIM_RECORD_DIR)).start()
+    await reset(dut)
+
+    # Programing mode (MODE=0), ROM and RAM accessed through the SPI address map
+    spi = PostSpiMaster(dut, clk_period=10, units="us")
+    await spi.idle()
+
+    code = [0x1, 0x3, 0x2, 0x6, 0xA, 0x5, 0xF, 0x7]
+    await spi.write_block(0x0F8, code)
+    assert await spi.read_block(0x0F8, len(code)) == code
+
+    tape = [1, 0, 1, 1, 0, 0, 1, 0]
+    await spi.write_block(0x4F8, tape)
+    assert await spi.read_block(0x4F8, len(tape)) == tape
+
+    # Slower SCK still works and single word accesses hit the same locations
+    spi.sck_div = 16
+    await spi.write(0x4FF, 1)
+    assert await spi.read(0x4FF) == 1
+    assert await spi.read(0x0FE) == 0xF
+    await recorder.save(Path(STIM_RECORD_DIR or ".") / "test_spi_master")
+
+
+@cocotb.test()
+async def test_spi_back_to_back_reads(dut):
+    dut._log.info("Start")
+    await start_and_reset(dut)
+
+    spi = PostSpiMaster(dut, clk_period=10, units="us")
+    await spi.idle()
+    loader = BackdoorLoader(dut, spi)
+    rom = [(7 * i + 3) & 0xF for i in range(256)]
+    ram = [(i * i >> 2) & 1 for i in range(256)]
+    await loader.load(rom, ram)
+
+    # A read command in place of the stuff word is not executed: the slave
+    # shifts out 0x0A5 and ignores MOSI, then takes the next word as a command.
+    words = [command_word(0x0A5, read=True), command_word(0x0A6, read=True),
+             command_word(0x4A6, read=True), STUFF_WORD]
+    replies = await spi.transfer_many(words)
+    assert replies[1] == command_word(0x0A5, rom[0xA5], read=True)
+    assert replies[2] == 0, "the read of 0x0A6 sent as a stuff word was executed"
+    assert replies[3] == command_word(0x4A6, ram[0xA6], read=True)
+
+    # Neither is a write sent as the stuff word
+    await spi.transfer_many([command_word(0x0A7, read=True), command_word(0x0A7, rom[0xA7] ^ 0xF)])
+    assert await spi.read(0x0A7) == rom[0xA7]
+
+    # Whole memories streamed as command/stuff pairs, data bits only
+    start, wall = get_sim_time("us"), time.perf_counter()
+    assert await spi.dump_rom() == bytearray(rom)
+    assert await spi.dump_ram() == bytearray(ram)
+    cycles = round((get_sim_time("us") - start) / 10)
+    dut._log.info(f"dump_rom + dump_ram: {cycles / 512:.0f} cycles per location, "
+                  f"{time.perf_counter() - wall:.2f} s")
+    if loader.available:
+        assert loader.read_rom() == bytearray(rom)
+        assert loader.read_ram() == bytearray(ram)
+
+
+@cocotb.test()
+async def test_backdoor_loader(dut):
+    dut._log.info("Start")
+    await start_and_reset(dut)
+
+    spi = PostSpiMaster(dut, clk_period=10, units="us")
+    await spi.idle()
+    loader = BackdoorLoader(dut, spi)
+
+    rom = [(3 * i + 1) & 0xF for i in range(256)]
+    ram = [(i >> 1) & 1 for i in range(256)]
+    await loader.load(rom, ram, verify=8, seed=1)
+    if not loader.available:
+        return
+
+    assert loader.read_rom() == bytearray(rom)
+    assert loader.read_ram() == bytearray(ram)
+
+    # Front door writes are visible through the backdoor
+    await spi.write(0x0A5, 0x9)
+    await spi.write(0x45A, 1 - ram[0x5A])
+    assert loader.read_rom()[0xA5] == 0x9
+    assert loader.read_ram()[0x5A] == 1 - ram[0x5A]
+
+
+@cocotb.test(skip=GATES)
+async def test_spi_waveform(dut):
+    """Whole images written through a compiled SPI waveform, against the per-bit transfer."""
+    dut._log.info("Start")
+    await start_and_reset(dut)
+
+    spi = PostSpiMaster(dut, clk_period=10, units="us")
+    await spi.idle()
+    loader = BackdoorLoader(dut, spi)
+    rom = bytes((5 * i + 2) & 0xF for i in range(256))
+    ram = bytes(((i >> 2) ^ i) & 1 for i in range(256))
+
+    # Compiled once, then served from memory; the disk cache is keyed by the images
+    with tempfile.TemporaryDirectory() as cache_dir:
+        waveform = image_waveform(spi.map, rom, ram, cache_dir=cache_dir)
+        assert image_waveform(spi.map, rom, ram, cache_dir=cache_dir) is waveform
+        assert len(list(Path(cache_dir).glob("*.mem"))) == 1
+
+        start, wall = get_sim_time("us"), time.perf_counter()
+        await spi.play(waveform)
+        compiled_wall = time.perf_counter() - wall
+        compiled_cycles = round((get_sim_time("us") - start) / 10)
+    # play() starts at the next falling edge
+    assert compiled_cycles - waveform.total_cycles in (0, 1)
+    # The outputs save_stim records for a replay of the same load
+    outputs = await snapshot(dut, loader)
+    assert {key: outputs[key] for key in ("uo_out", "uio_out")} == load_outputs(spi.map, rom, ram)
+    await FallingEdge(dut.clk)
+    if loader.available:
+        assert (loader.read_rom(), loader.read_ram()) == (bytearray(rom), bytearray(ram))
+    else:
+        assert (await spi.dump_rom(), await spi.dump_ram()) == (bytearray(rom), bytearray(ram))
+
+    # The per-bit transfer (sampling MISO) of the complemented images takes the same cycles
+    rom, ram = bytes(c ^ 0xF for c in rom), bytes(c ^ 1 for c in ram)
+    await spi.idle()
+    start, wall = get_sim_time("us"), time.perf_counter()
+    await spi.transfer_many(image_words(spi.map, rom, ram).tolist(), capture=1)
+    per_bit_wall = time.perf_counter() - wall
+    assert round((get_sim_time("us") - start) / 10) == compiled_cycles
+    assert (await spi.dump_rom(), await spi.dump_ram()) == (bytearray(rom), bytearray(ram))
+    dut._log.info(f"512 location load: {compiled_cycles} cycles, compiled {compiled_wall:.2f} s, "
+                  f"per bit {per_bit_wall:.2f} s ({per_bit_wall / compiled_wall:.1f}x)")
+
+
+@cocotb.test()
+async def test_reference_model(dut):
+    dut._log.info("Start")
+    await start_and_reset(dut)
+
+    spi = PostSpiMaster(dut, clk_period=10, units="us")
+    await spi.idle()
+    loader = BackdoorLoader(dut, spi)
+
+    # Unary increment: move right over the 1s and set the first 0
+    rom = assemble_cached(UNARY_INCREMENT)
+    assert list(rom[:10]) == [0x6, 0x0, 0x8, 0x1, 0x5, 0x0, 0x0, 0x0, 0x3, 0x7]
+    assert assemble(listing(rom)) == rom
+    assert assemble(UNARY_INCREMENT.replace(" ", "\t")) == rom
+    tape = [1, 1, 1]
+    expected = run_program(rom, tape)
+    assert expected.halted
+    await loader.load(rom, tape)
+
+    cycles, ip, dp = await execute(dut, timeout_cycles=expected.cycles + 16)
+    assert cycles == expected.cycles
+    assert ip == expected.ip
+    assert dp == expected.dp
+    assert await read_tape(loader) == expected.tape
+
+
+@cocotb.test()
+async def test_cpu_monitor(dut):
+    dut._log.info("Start")
+    await start_and_reset(dut)
+    loader = BackdoorLoader(dut, PostSpiMaster(dut, clk_period=10, units="us"))
+    await loader.spi.idle()
+
+    # 00: jmp 0x00 never halts, wait_halt must time out instead of hanging
+    await loader.load([0x5, 0x0, 0x0])
+    dut.ui_in.value = MSK_MODE_TO_ON | MSK_OUT_CTRL_TO_4
+    await ClockCycles(dut.clk, 16)
+
+    monitor = CpuMonitor(dut, clk_period=10, units="us").start()
+    # with make -B DUMP=1 DUMP_PAUSED=1 only the first jmp iterations are dumped
+    WaveDump(dut).on_trigger(monitor.wait_state(JMP_EXE), cycles=20)
+    dut.ui_in.value = MSK_MODE_TO_ON | MSK_OUT_CTRL_TO_4 | MSK_RUN_TO_ON
+    try:
+        await monitor.wait_halt(timeout_cycles=200)
+    except SimTimeoutError:
+        pass
+    else:
+        assert False, "jmp loop halted"
+
+    assert monitor.state != STOP
+    assert monitor.halts == 0
+    # Each jmp spends one cycle in fetch_decode and one in jmp_exe
+    assert abs(monitor.cycles_in(FETCH_DECODE) - monitor.cycles_in(JMP_EXE)) <= 1
+    assert 190 <= monitor.run_cycles <= 200
+    dut._log.info(f"cycles per state: {monitor.stats()}")
+
+
+@cocotb.test()
+async def test_session(dut):
+    """fast_reset recovers a session from a program that never stops."""
+    session = await PostSession.attach(dut)
+    try:
+        await session.run([0x5, 0x0, 0x0], timeout_cycles=100)   # 00: jmp 0x00
+    except SimTimeoutError:
+        pass
+    else:
+        assert False, "jmp loop halted"
+    await session.fast_reset()
+    rom = assemble_cached(UNARY_INCREMENT)
+    assert await session.run(rom, [1, 1]) == run_program(rom, [1, 1])
+
+
+def link_client(address, rom, tape, out):
+    """Host side of ``test_spi_server``, run in a thread of the simulator process."""
+    try:
+        with PostLink(address) as link:
+            link.write_block(ROM_BASE, rom[:16])
+            link.write_block(RAM_BASE, list(tape) + [0] * (16 - len(tape)))
+            out["run"] = link.run(timeout_cycles=10000)
+            out["tape"] = link.read_block(RAM_BASE, 16)
+            out["rom"] = link.read_block(ROM_BASE, 16)
+            try:
+                link.execute(Batch().wait_halt(100))
+            except LinkError as error:
+                out["error"] = str(error)
+            out["round_trips"], out["words"] = link.round_trips, link.words
+    except Exception as error:     # reported by the test
+        out["exception"] = error
+
+
+@cocotb.test()
+async def test_spi_server(dut):
+    """Batches of SPI words and pin commands from a PostLink client over a socket.
+
+    With SPI_SERVER=<host:port or path> (``make serve``) the test serves
+    that address to an external client instead.
+    """
+    session = await PostSession.attach(dut)
+    external = os.environ.get("SPI_SERVER")
+    if external:
+        server = SpiServer(session, external, accept_timeout=None).listen()
+        dut._log.info(f"serving the Post system on {external}")
+        await server.serve()
+        dut._log.info(f"{server.batches} batches, {server.words} SPI words")
+        return
+
+    rom = assemble_cached(UNARY_INCREMENT)
+    tape = [1, 1, 1]
+    expected = fast_run_program(rom, tape)
+    with tempfile.TemporaryDirectory() as tmp:
+        address = str(Path(tmp) / "post.sock")
+        server = SpiServer(session, address).listen()
+        out = {}
+        client = threading.Thread(target=link_client, args=(address, rom, tape, out))
+        client.start()
+        await server.serve()
+        client.join()
+    assert "exception" not in out, repr(out.get("exception"))
+    assert out["run"] == (True, expected.cycles, expected.ip, expected.dp)
+    assert out["tape"] == list(expected.tape[:16])
+    assert out["rom"] == list(rom[:16])
+    assert "SimTimeoutError" in out["error"]
+    # Bulk replies: one round trip per block, not per word
+    assert out["round_trips"] == 6 and out["words"] == 16 + 16 + 32 + 32
+    assert server.batches == 5 and server.words == out["words"]
+
+
+@cocotb.test()
+async def test_cpu_trace(dut):
+    """Instruction trace of the RTL, its binary file and queries."""
+    session = await PostSession.attach(dut)
+    rom = assemble_cached(UNARY_INCREMENT)
+    tape = [1, 1, 1]
+    tracer = CpuTracer(dut, clk_period=10, units="us")
+    if not tracer.available:
+        return
+    tracer.start(tape)
+    result = await session.run(rom, tape)
+    trace = tracer.stop()
+    expected = trace_program(rom, tape)
+    assert list(trace) == list(expected)
+    assert (trace.cycles, trace.halted) == (result.cycles, True) == (expected.cycles, expected.halted)
+
+    # 00: jz 08 / 03: incdp / 04: jmp 00 three times, then 00: jz (taken) / 08: set / 09: stop
+    assert trace.ip_histogram() == {0x0: 4, 0x3: 3, 0x4: 3, 0x8: 1, 0x9: 1}
+    assert [(s.ip, s.dp, s.read, s.write) for s in trace.writes()] == [(0x8, 3, 0, 1)]
+    assert trace.writes(dp=0x3F) == []
+    assert [s.ip for s in trace.jumps(target=0x00)] == [0x4] * 3
+    assert [(s.ip, s.read) for s in trace.jumps(target=0x08)] == [(0x0, 0)]
+    last = trace[len(trace) - 1]
+    assert trace.ip_histogram(start=last.cycle) == {0x9: 1}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "unary_increment.trc"
+        trace.save(path)
+        assert path.stat().st_size == HEADER.size + 9 * len(trace)
+        mapped = open_trace(path)
+        assert list(mapped) == list(trace)
+        assert (mapped.cycles, mapped.halted) == (trace.cycles, trace.halted)
+        assert mapped.summary() == trace.summary()
+        mapped.close()
+
+        # 10 bit build: 16 bit ip, dp and target columns
+        wide = trace_program(assemble(FILL, 10), add_width=10)
+        assert wide.halted and int(wide.dp_trace().max()) == 1023
+        wide.save(path)
+        assert path.stat().st_size == HEADER.size + 12 * len(wide)
+        mapped = open_trace(path)
+        assert list(mapped) == list(wide) and mapped.add_width == 10
+        mapped.close()
+
+
+async def run_library_program(dut, path):
+    """Run the EPM program at ``path`` in the shared session and check it against the model."""
+    session = await PostSession.attach(dut)
+    source = path.read_text()
+    rom = assemble_cached(source)
+    tape = source_tape(source)
+    expected = run_program(rom, tape)
+    assert expected.halted, f"{path.name} does not halt"
+    assert fast_run_program(rom, tape) == expected, path.name
+
+    # Profile and trace of the run in one pass over the state transitions
+    watcher = CpuWatcher(dut, clk_period=10, units="us")
+    if watcher.available:
+        profile, trace = watcher.start(Profile(), Trace(tape)).sinks
+    result = await session.run(rom, tape, timeout_cycles=expected.cycles + 16)
+    dut._log.info(f"{path.name}: {result.cycles} cycles, IP=0x{result.ip:02X}, DP=0x{result.dp:02X}")
+    assert result == expected, path.name
+
+    if watcher.available:
+        watcher.stop()
+        expected_profile, expected_trace = run_model(rom, tape, [Profile(), Trace(tape)])
+        assert profile.to_dict() == expected_profile.to_dict(), path.name
+        if PROFILE_DIR:
+            Path(PROFILE_DIR).mkdir(parents=True, exist_ok=True)
+            (Path(PROFILE_DIR) / f"{path.stem}.json").write_text(profile.to_json(indent=2))
+        assert list(trace) == list(expected_trace), path.name
+        if TRACE_DIR:
+            Path(TRACE_DIR).mkdir(parents=True, exist_ok=True)
+            trace.save(Path(TRACE_DIR) / f"{path.stem}.trc")
+
+
+def library_test(path):
+    """cocotb test running ``path``, named by ``program_test_name``."""
+    async def run(dut):
+        await run_library_program(dut, path)
+    run.__name__ = run.__qualname__ = program_test_name(path)
+    run.__doc__ = f"Run {path.name} and check it against the model."
+    return cocotb.test()(run)
+
+
+# One test per program of the library, all in this simulator process
+for _path in program_files():
+    globals()[program_test_name(_path)] = library_test(_path)
+
+
+@cocotb.test(skip=GATES)
+async def test_benchmarks(dut):
+    """Cycles to halt, SPI load time and simulator throughput of benchmarks/*.epm.
+
+    The cycle counts are checked against the RTL or gate level baseline;
+    the throughput only under ``make bench`` (``BENCH_THROUGHPUT=1``).
+    """
+    dut._log.info("Start")
+    start_clock(dut)
+    spi = PostSpiMaster(dut, clk_period=10, units="us")
+    loader = BackdoorLoader(dut, spi)
+    results = {}
+
+    for path in benchmark_files():
+        await reset(dut)
+        await spi.idle()
+        source = path.read_text()
+        rom = assemble_cached(source)
+        tape = source_tape(source)
+        expected = run_program(rom, tape)
+        assert expected.halted, f"{path.name} does not halt"
+
+        # Code and starting tape through SPI; the rest of both memories is
+        # cleared through the backdoor (or SPI at gate level) outside the measurement.
+        code = rom[:max((i + 1 for i, c in enumerate(rom) if c), default=1)]
+        if loader.available:
+            loader.write_rom([])
+            loader.write_ram([])
+        else:
+            code = rom
+            tape = list(tape) + [0] * (256 - len(tape))
+        # One transfer counted from a falling CLK edge, so the count does
+        # not depend on where the previous await left the clock.
+        await FallingEdge(dut.clk)
+        start, wall = get_sim_time("us"), time.perf_counter()
+        await spi.load_images(code, tape or None)
+        load_wall = time.perf_counter() - wall
+        load_cycles = round((get_sim_time("us") - start) / 10)
+
+        wall = time.perf_counter()
+        cycles, ip, dp = await execute(dut, timeout_cycles=expected.cycles + 16)
+        run_wall = time.perf_counter() - wall
+        assert (cycles, ip, dp) == (expected.cycles, expected.ip, expected.dp), path.name
+
+        results[path.stem] = {
+            "cycles": cycles,
+            "run_wall_s": run_wall,
+            "ms_per_kcycle": run_wall * 1e6 / cycles,
+            "load_cycles": load_cycles,
+            "load_wall_s": load_wall,
+        }
+        dut._log.info(f"{path.stem}: {cycles} cycles, {run_wall * 1e6 / cycles:.2f} ms/kcycle, "
+                      f"load {load_cycles} cycles in {load_wall * 1e3:.1f} ms")
+
+    sim_key = f"{cocotb.SIM_NAME.split()[0].lower()}/{'rtl' if loader.available else 'gl'}"
+    baseline = load_baseline()
+    others = dict(baseline["throughput"])
+    if os.environ.get("BENCH_RESULTS"):
+        merged = merge_results(os.environ["BENCH_RESULTS"], results, sim_key)
+        others.update({key: suite_throughput(r) for key, r in merged.items()})
+    for note in compare_simulators(results, sim_key, others):
+        dut._log.info(note)
+    if os.environ.get("BENCH_UPDATE") == "1":
+        update_baseline(results, baseline, sim_key)
+        dut._log.info(f"baseline updated for {sim_key}")
+        return
+    regressions, notes = compare(results, baseline, sim_key, os.environ.get("BENCH_THROUGHPUT") == "1")
+    for note in notes:
+        dut._log.info(note)
+    assert not regressions, "benchmark regressions: " + "; ".join(regressions)
+
+
+@cocotb.test(skip=GATES)
+async def test_memory_scaling(dut):
+    """Load time, run time and cycles to halt of FILL at the build's IP/DP width (make scaling)."""
+    dut._log.info("Start")
+    start_clock(dut)
+    await reset(dut)
+    try:
+        add_width = len(dut.user_project.my_PostSys.my_cpu.IP_reg)
+    except AttributeError:
+        add_width = ADD_WIDTH   # gate level: the Tiny Tapeout build
+    address_map = AddressMap(add_width)
+    spi = PostSpiMaster(dut, clk_period=10, units="us", address_map=address_map)
+    loader = BackdoorLoader(dut, spi)
+    await spi.idle()
+
+    rom = assemble_cached(FILL, add_width=add_width)
+    assert assemble(listing(rom, add_width=add_width), add_width) == rom
+    wall = time.perf_counter()
+    expected = run_program(rom, [], 1 << 24, add_width)
+    model_wall = time.perf_counter() - wall
+    assert expected.halted and all(expected.tape)
+
+    # Front door: the code and a cleared tape, every cell of it
+    start, wall = get_sim_time("us"), time.perf_counter()
+    await spi.write_block(address_map.rom_base, rom[:FILL_NIBBLES])
+    await spi.write_block(address_map.ram_base, [0] * address_map.ram_size)
+    spi_load_wall = time.perf_counter() - wall
+    spi_load_cycles = round((get_sim_time("us") - start) / 10)
+
+    # Back door: the same images in, the tape out
+    backdoor_wall = None
+    if loader.available:
+        wall = time.perf_counter()
+        loader.write_rom(rom)
+        loader.write_ram([])
+        assert not any(loader.read_ram())
+        backdoor_wall = time.perf_counter() - wall
+
+    wall = time.perf_counter()
+    cycles, ip, dp = await execute(dut, timeout_cycles=expected.cycles + 16)
+    run_wall = time.perf_counter() - wall
+    # OUT8B shows the low byte of IP and DP
+    assert (cycles, ip, dp) == (expected.cycles, expected.ip & 0xFF, expected.dp & 0xFF)
+    if loader.available:
+        assert loader.read_ram() == expected.tape
+    await spi.idle()
+    top = address_map.ram_base + address_map.ram_size - 4
+    assert await spi.read_block(top, 4) == [1] * 4
+
+    results = {
+        "cells": address_map.ram_size,
+        "run_cycles": cycles,
+        "run_wall_s": run_wall,
+        "spi_load_cycles": spi_load_cycles,
+        "spi_load_wall_s": spi_load_wall,
+        "model_wall_s": model_wall,
+    }
+    if backdoor_wall is not None:
+        results["backdoor_wall_s"] = backdoor_wall
+    dut._log.info(f"{add_width} bit IP/DP, {address_map.ram_size} cells: {cycles} cycles to halt in "
+                  f"{run_wall:.2f} s, SPI load {spi_load_cycles} cycles in {spi_load_wall:.2f} s")
+    if os.environ.get("SCALING_RESULTS"):
+        sim_key = f"{cocotb.SIM_NAME.split()[0].lower()}/aw{add_width}"
+        merged = merge_results(os.environ["SCALING_RESULTS"], results, sim_key)
+        dut._log.info("\n" + scaling_table(merged))
+
+
+async def signature_run(dut, spi, rom, tape, run_cycles):
+    """Pin level run for ``test_gl_equivalence``: SPI load, run, DP and tape readback."""
+    # Whole images, so that nothing is left over from the previous tests
+    await spi.write_block(ROM_BASE, list(rom) + [0] * (256 - len(rom)))
+    await spi.write_block(RAM_BASE, list(tape) + [0] * (256 - len(tape)))
+    dut.ui_in.value = MSK_MODE_TO_ON | MSK_OUT_CTRL_TO_4 | MSK_RUN_TO_ON
+    await ClockCycles(dut.clk, run_cycles)
+    await ReadOnly()
+    state, ip = int(dut.uio_out.value) & MSK_STATE, int(dut.uo_out.value)
+    await FallingEdge(dut.clk)
+    dut.ui_in.value = MSK_MODE_TO_ON | MSK_OUT_CTRL_TO_6
+    await ClockCycles(dut.clk, 1)
+    await ReadOnly()
+    dp = int(dut.uo_out.value)
+    await FallingEdge(dut.clk)
+    dut.ui_in.value = 0
+    await spi.idle()
+    return state, ip, dp, await spi.dump_ram()
+
+
+@cocotb.test(skip=GATES and not os.environ.get("SIGNATURE_MODE"))
+async def test_gl_equivalence(dut):
+    """Hashes of the outputs per window of cycles, saved from RTL and checked at gate level.
+
+    SIGNATURE_MODE=record saves them to $SIGNATURE_DIR/<program>.json,
+    SIGNATURE_MODE=check stops at the first window that differs from that
+    file (``make signature``, ``make gl-check``). The program is
+    $SIGNATURE_PROGRAM (benchmarks/binary_counter.epm by default).
+    """
+    path = Path(os.environ.get("SIGNATURE_PROGRAM", BENCH_DIR / "binary_counter.epm"))
+    mode = os.environ.get("SIGNATURE_MODE")
+    saved = Path(os.environ.get("SIGNATURE_DIR", "signatures")) / f"{path.stem}.json"
+    source = path.read_text()
+    rom, tape = assemble_cached(source), source_tape(source)
+    expected = fast_run_program(rom, tape)
+    assert expected.halted, f"{path.name} does not halt"
+
+    start_clock(dut)
+    await reset(dut)
+    spi = PostSpiMaster(dut, clk_period=10, units="us")
+    await spi.idle()
+    window, reference = WINDOW_CYCLES, None
+    if mode == "check":
+        recorded = load_signature(saved)
+        window, reference = recorded["window"], recorded["hashes"]
+    signature = await OutputSignature(dut, window, clk_period=10, units="us", reference=reference).start()
+    if os.environ.get("SIGNATURE_DUMP_WINDOW"):
+        WaveDump(dut).window(window, after=int(os.environ["SIGNATURE_DUMP_WINDOW"]) * window)
+
+    run = cocotb.start_soon(signature_run(dut, spi, rom, tape, expected.cycles + 16))
+    await First(run.join(), signature.diverged.wait())
+    if not run.done():
+        run.kill()
+    signature.stop()
+    if signature.mismatch is not None:
+        start, stop = signature.span(signature.mismatch)
+        raise AssertionError(
+            f"outputs differ from {saved} in window {signature.mismatch}, cycles [{start}, {stop}); "
+            f"dump it with DUMP=1 DUMP_PAUSED=1 SIGNATURE_DUMP_WINDOW={signature.mismatch}")
+
+    state, ip, dp, ram = await run
+    assert (state, ip, dp, ram) == (STOP, expected.ip, expected.dp, expected.tape), path.name
+    dut._log.info(f"{path.name}: {signature.cycles} cycles in {len(signature.hashes)} windows of {window}, "
+                  f"last hash {signature.hashes[-1]}")
+    if mode == "record":
+        signature.save(saved)
+        dut._log.info(f"signature saved to {saved}")
+
+
+@cocotb.test(skip=GATES)
+async def test_fuzz(dut):
+    """Differential fuzzing of the RTL against the model.
+
+    FUZZ_CASES programs (default 64) from the coverage-guided generator with
+    seed FUZZ_SEED; a mismatch is shrunk and written to FUZZ_OUT.
+    """
+    dut._log.info("Start")
+    session = await PostSession.attach(dut)
+    monitor = CpuMonitor(dut, clk_period=10, units="us").start()
+    fuzzer = Fuzzer(seed=int(os.environ.get("FUZZ_SEED", "1")))
+    cases = int(os.environ.get("FUZZ_CASES", "64"))
+
+    async def run_case(rom, tape, timeout_cycles):
+        try:
+            return await session.run(rom, tape, timeout_cycles)
+        except SimTimeoutError:
+            await session.fast_reset()
+            return None
+
+    async def fails(rom, tape):
+        expected = run_program(rom, tape, fuzzer.max_cycles)
+        return expected.halted and await run_case(rom, tape, expected.cycles + 16) != expected
+
+    done = 0
+    while done < cases:
+        roms, tapes, batch, keep = fuzzer.next_batch()
+        keep = keep[:cases - done]
+        # The kept programs run back to back after one reset and are checked as a whole
+        halted, cycles, ip, dp, ram = await session.run_batch(roms[keep], tapes[keep], batch.cycles[keep] + 16)
+        wrong = (~halted | (cycles != batch.cycles[keep]) | (ip != batch.ip[keep]) | (dp != batch.dp[keep])
+                 | (ram != batch.tape[keep]).any(axis=1))
+        for j in wrong.nonzero()[0][:1]:
+            rom, tape = await shrink(roms[keep[j]].tolist(), tapes[keep[j]].astype(int).tolist(), fails)
+            actual = await run_case(rom, tape, run_program(rom, tape).cycles + 16)
+            out = Path(os.environ.get("FUZZ_OUT", "fuzz_failures"))
+            out.mkdir(parents=True, exist_ok=True)
+            path = out / f"seed{os.environ.get('FUZZ_SEED', '1')}_case{done + j}.epm"
+            path.write_text(reproducer(rom, tape, f"RTL gave {actual and actual[:4]}"))
+            assert False, f"RTL and model disagree, minimal reproducer in {path}"
+        done += len(keep)
+
+    report = coverage_report(fuzzer.features)
+    seen = {t for t in monitor.transitions}
+    # fetch_decode -> fetch_decode (nop) does not change state_reg
+    missing = ALL_TRANSITIONS - seen - {(FETCH_DECODE, FETCH_DECODE)}
+    monitor.stop()
+    dut._log.info(f"{done} cases from {fuzzer.generated} generated, {fuzzer.halting} halting, "
+                  f"corpus {len(fuzzer.corpus)}; model coverage {report}")
+    dut._log.info(f"RTL transitions seen: {len(seen)}, missing: {sorted(missing)}")
+    assert not missing, f"FSM transitions not exercised on the RTL: {sorted(missing)}"
+    assert not report["missing_branches"], f"decode branches not exercised: {report['missing_branches']}"
@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Checks of the Python models that need no simulator (``python -m pytest test_models.py``)."""
+
+import numpy as np
+
+from batch_model import PostBatch, all_programs
+from bench import benchmark_files
+from epm_asm import assemble, assemble_cached, listing, source_tape
+from fast_model import FastPostModel, fast_run_program
+from fuzz import Fuzzer
+from post_model import run_program
+
+
+def test_batch_model():
+    # Every 3 instruction program over nop..stop, on a zero and a ones tape
+    programs = all_programs(3, range(8))
+    for tape in ([], [1] * 256):
+        batch = PostBatch(programs, [tape] * len(programs) if tape else None).run(max_cycles=64)
+        for i in range(0, len(programs), 37):
+            expected = run_program(list(programs[i]), tape, max_cycles=64)
+            assert bool(batch.halted[i]) == expected.halted
+            if expected.halted:
+                assert (batch.cycles[i], batch.ip[i], batch.dp[i]) == (expected.cycles, expected.ip, expected.dp)
+
+
+def test_fast_model():
+    """The loop accelerated model gives the results of run_program, timeouts included."""
+    fuzzer = Fuzzer(seed=5)
+    for _ in range(4):
+        roms, tapes, _, _ = fuzzer.next_batch(64)
+        for rom, tape in zip(roms.tolist(), tapes.tolist()):
+            for budget in (fuzzer.max_cycles, 97, 20000):
+                assert fast_run_program(rom, tape, budget) == run_program(rom, tape, budget), listing(rom)
+    for path in benchmark_files():
+        source = path.read_text()
+        rom, tape = assemble_cached(source), source_tape(source)
+        assert fast_run_program(rom, tape) == run_program(rom, tape), path.name
+
+    # Set every cell, forever: 8 cycles per cell, the same state every 256 cells
+    rom = assemble("loop:\n set\n incdp\n jmp loop\n")
+    model = FastPostModel(rom)
+    near = model.run([], 100003)
+    assert near == run_program(rom, [], 100003)
+    far = model.run([], 100003 + 8 * 256 * 10**7)
+    assert not far.halted and far.tape == bytearray([1] * 256)
+    assert (far.cycles - near.cycles, far.ip, far.dp) == (8 * 256 * 10**7, near.ip, near.dp)
+
+
+def test_listing_round_trip():
+    """``listing`` of any image assembles back to it, wide builds included."""
+    rng = np.random.default_rng(3)
+    for add_width in (8, 10, 12):
+        for _ in range(20):
+            rom = bytearray(rng.integers(0, 16, 1 << add_width, dtype=np.uint8).tobytes())
+            assert assemble(listing(rom, add_width=add_width), add_width) == rom
@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: © 2025 Gerardo Laguna-Sanchez
+# SPDX-License-Identifier: Apache-2.0
+
+"""Control of the opt-in waveform dump of tb.v (make -B DUMP=1).
+
+``WaveDump`` drives the ``dump_on`` register of the testbench, which
+calls $dumpon/$dumpoff. Without DUMP=1 the register does not exist and
+every method is a no-op (``window``/``on_trigger`` start no task and
+return None), so tests can leave the calls in place.
+"""
+
+import cocotb
+from cocotb.triggers import Timer
+
+
+class WaveDump:
+    """Pause and resume the waveform dump of ``tb``."""
+
+    def __init__(self, dut, clk_period=10, units="us"):
+        self.clk_period = clk_period
+        self.units = units
+        try:
+            self._ctl = dut.dump_on
+        except AttributeError:
+            self._ctl = None
+
+    @property
+    def available(self):
+        return self._ctl is not None
+
+    def on(self):
+        if self._ctl is not None:
+            self._ctl.value = 1
+
+    def off(self):
+        if self._ctl is not None:
+            self._ctl.value = 0
+
+    async def _window(self, start, cycles):
+        if start is not None:
+            await start
+        self.on()
+        await Timer(cycles * self.clk_period, units=self.units)
+        self.off()
+
+    def window(self, cycles, after=0):
+        """Dump ``cycles`` CLK cycles starting ``after`` cycles from now."""
+        if self._ctl is None:
+            return None
+        start = Timer(after * self.clk_period, units=self.units) if after else None
+        return cocotb.start_soon(self._window(start, cycles))
+
+    def on_trigger(self, trigger, cycles):
+        """Dump ``cycles`` CLK cycles once ``trigger`` fires.
+
+        ``trigger`` is anything awaitable, e.g. ``monitor.wait_state(JZ_EXE)``.
+        """
+        if self._ctl is None:
+            if hasattr(trigger, "close"):
+                trigger.close()     # an unawaited coroutine
+            return None
+        return cocotb.start_soon(self._window(trigger, cycles))